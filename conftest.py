@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        conftest
+# Purpose:     pytest fixtures shared by the pyrad tests: fake DataSnap servers
+#              (see pyrad_fakeserver) and clients connected to them
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyrad, pyradclasses as PyRAD
+import pytest
+from pyrad_fakeserver import FakeDSServer
+
+#-------------------------------------------------------------------------------
+
+@pytest.fixture
+def server():
+    "Fake server with 10 packages (of 5 components each)"
+    with FakeDSServer(Packages=10, Components=5) as Server:
+        yield Server
+
+@pytest.fixture
+def slow_server():
+    "Fake server taking 0.3 s per call and serving the calls concurrently"
+    with FakeDSServer(Packages=10, Components=5, Latency=0.3, Serial=False) as Server:
+        yield Server
+
+@pytest.fixture
+def connect():
+    """
+    Factory of clients: connect(Server, **DSConfig) returns a PReq object
+    for the server (with the extra DSConfig values), closed after the test.
+    """
+    clients = []
+    def connect(Server, **DSConfig):
+        Req = pyrad.PReq('', dict(Server.DSConfig, **DSConfig))
+        clients.append(Req)
+        return Req
+    yield connect
+    for Req in clients: Req.close()
+
+@pytest.fixture
+def ide(server):
+    "The fake server set as the server of the global client (see pyradclasses.Reload)"
+    PyRAD.Reload(server.DSConfig)
+    try:
+        yield server
+    finally:
+        PyRAD.Req.close()
+        PyRAD.Req = None
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyrad_batch_test
+# Purpose:     tests of the concurrent batches of PReq (see PReq.get_results)
+#              against the fake DataSnap server (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyrad, threading, pytest
+
+#-------------------------------------------------------------------------------
+
+def test_get_results(slow_server, connect):
+    Req = connect(slow_server, BatchWidth=10)
+    t0 = pyrad.timer()
+    results = Req.get_results([('IDE_Packages_getPackageInfoValue', (i, 'Name')) for i in range(10)] +
+                              [('IDE_Packages_getCompCount', (99,)), 'IDE_Packages_getCount'])
+    assert pyrad.timer() - t0 < 1.0
+    assert results[:10] == ['dclpackage{0}_250.bpl'.format(i) for i in range(10)]
+    assert results[10:] == ['ERROR: Wrong package index 99!', 10]
+
+def test_batch_pool_created_once(slow_server, connect, monkeypatch):
+    pools = []
+    ThreadPool = pyrad.ThreadPool
+    monkeypatch.setattr(pyrad, 'ThreadPool', lambda *args: pools.append(1) or ThreadPool(*args))
+    Req = connect(slow_server)
+    threads = [threading.Thread(target=lambda: Req.get_results(['IDE_Packages_getCount'] * 4))
+               for _ in range(4)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    assert len(pools) == 1
+
+def test_nested_batches(server, connect):
+    Req = connect(server, BatchWidth=2)
+    nested = []
+    def after(func_name, args, result, elapsed):
+        # a batch started from the calls of a batch on the shared pool
+        if func_name == 'IDE_Packages_getCount':
+            nested.append(Req.get_results([('IDE_Packages_getCompCount', (i,)) for i in range(3)]))
+    Req.add_hook('after', after)
+    thread = threading.Thread(target=lambda: Req.get_results(['IDE_Packages_getCount'] * 4))
+    thread.daemon = True
+    thread.start()
+    thread.join(10)
+    assert not thread.is_alive()
+    assert nested == [[5] * 3] * 4
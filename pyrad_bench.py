@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyrad_bench
+# Purpose:     performance benchmarks for pyrad
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+from __future__ import print_function
+import pyrad, pyradclasses as PyRAD
+import sys, os, json, random, time, timeit, platform, argparse, subprocess, tempfile
+from pyrad import xrange
+from pyrad_fakeserver import FakeDSServer, encode_result, package_info, main_menu
+
+#-------------------------------------------------------------------------------
+
+def legacy_parse(content, encoding='utf-8'):
+    """
+    Reference copy of the original PReq response decoding
+    (req.text -> __format_result_text -> json.loads -> __format_result).
+    """
+    sRes = content.decode(encoding, 'replace')
+    sRes = sRes.replace(r'["{', '[{').replace(r'}"]', '}]')
+    sRes = sRes.replace(r'["[', '[[').replace(r']"]', ']]')
+    sRes = sRes.replace(r'["\"', '["').replace(r'\""]', '"]')
+    sRes = sRes.replace(r'\"', r'"')
+    try:
+        if not (sRes.startswith('{') and sRes.endswith('}') and (':' in sRes)):
+            return sRes
+        Res = json.loads(sRes)
+    except Exception as err:
+        raise pyrad.EGenericError('Error: {0}\nRaw result: {1}'.format(pyrad.tostr(err), sRes))
+    if 'result' in Res:
+        return Res['result'][0] if len(Res['result']) else None
+    elif 'error' in Res:
+        return 'ERROR: ' + Res['error']
+    elif 'SessionExpired' in Res:
+        return 'ERROR: ' + Res['SessionExpired']
+    return Res[len(Res.keys())-1]
+
+def sample_payloads(npackages=300):
+    """
+    Return a list of (description, response bytes) for typical server responses.
+    """
+    return [('bool', encode_result(True)),
+            ('int', encode_result(npackages)),
+            ('string', encode_result('dclpackage1_250.bpl')),
+            ('error', json.dumps({'error': 'Wrong index!'}).encode('utf-8')),
+            ('package info', encode_result(package_info(1))),
+            ('package info (utf-8)', encode_result(dict(package_info(2), Description=u'\u041f\u0430\u043a\u0435\u0442'), False)),
+            ('package names', encode_result([package_info(i)['Name'] for i in range(npackages)])),
+            ('package file names', encode_result([package_info(i)['FileName'] for i in range(npackages)])),
+            ('environment', encode_result({'RootDirectory': 'c:\\program files (x86)\\embarcadero\\studio\\23.0\\',
+                                           'ProductIdentifier': 'Delphi', 'ParentHandle': 65812})),
+            ('main menu', encode_result(main_menu(npackages * 4)))]
+
+def random_value(depth=0):
+    "Random JSON value with awkward strings (quotes, backslashes, brackets)"
+    choice = random.randint(0, 7 if depth < 3 else 4)
+    if choice == 0: return random.randint(-10**6, 10**6)
+    if choice == 1: return random.random() * 1000
+    if choice == 2: return random.choice([True, False, None])
+    if choice in (3, 4):
+        return u''.join(random.choice(u'ab \\"[]{}:,/\u0436') for _ in range(random.randint(0, 8)))
+    if choice in (5, 6):
+        return [random_value(depth + 1) for _ in range(random.randint(0, 4))]
+    return dict((u'k{0}'.format(i), random_value(depth + 1)) for i in range(random.randint(0, 4)))
+
+def _decode(Req, content):
+    "Decode with both paths, returning (result or exception class) pairs"
+    results = []
+    for parse in (lambda: Req._parse_result(content, 'utf-8'), lambda: legacy_parse(content)):
+        try:
+            results.append(parse())
+        except pyrad.EGenericError as err:
+            results.append(err.__class__)
+    return results
+
+def check_decode(nsamples=20000, seed=0):
+    """
+    Check that PReq._parse_result returns the same results (or raises the same
+    errors) as the original decoding for the sample payloads and for random
+    double-encoded values. Returns the number of checked payloads.
+    """
+    Req = pyrad.PReq.__new__(pyrad.PReq)
+    random.seed(seed)
+    payloads = [content for _, content in sample_payloads()]
+    payloads += [encode_result(random_value(), random.random() < 0.5) for _ in range(nsamples)]
+    for content in payloads:
+        new, old = _decode(Req, content)
+        if new != old:
+            raise AssertionError('Decoding mismatch for {0!r}: {1!r} != {2!r}'.format(content, new, old))
+    return len(payloads)
+
+def check_stream(nsamples=2000, seed=0):
+    """
+    Check that the streaming decoder (pyrad.PStreamDecoder) yields the same
+    items as PReq._parse_result (list elements, string lines or the single result)
+    for the sample payloads and random values, split into chunks of various sizes.
+    Returns the number of checked payloads.
+    """
+    Req = pyrad.PReq.__new__(pyrad.PReq)
+    parse = lambda content: Req._parse_result(content, 'utf-8')
+    random.seed(seed)
+    payloads = [content for _, content in sample_payloads(30)]
+    payloads += [encode_result([random_value(2) for _ in range(random.randint(0, 5))])
+                 for _ in range(nsamples // 2)]
+    payloads += [encode_result(random.choice([u'', u'\r\n', u'a\nb\r\n\r\nc\\n\\', u'\u0436\n']) * random.randint(0, 3))
+                 for _ in range(nsamples // 2)]
+    nchecked = 0
+    for content in payloads:
+        try:
+            Res = parse(content)
+        except pyrad.EGenericError:
+            continue
+        expected = Res if isinstance(Res, list) else \
+                   Res.splitlines() if isinstance(Res, pyrad.basestring) else [Res]
+        for chunksize in (1, 2, 3, 7, 64, len(content) or 1):
+            decoder = pyrad.PStreamDecoder(parse)
+            items = []
+            for i in range(0, len(content), chunksize):
+                items += decoder.feed(content[i:i+chunksize])
+            items += decoder.close()
+            if items != expected:
+                raise AssertionError('Streaming mismatch for {0!r} (chunk size {1}): {2!r} != {3!r}'.format(
+                                     content, chunksize, items, expected))
+        nchecked += 1
+    return nchecked
+
+def bench_decode(number=2000, npackages=300):
+    """
+    Micro-benchmark: time the original and the current response decoding
+    for each sample payload (the best of 3 runs of 'number' calls).
+    Returns a list of dictionaries (payload, size, legacy_us, current_us, speedup).
+    """
+    Req = pyrad.PReq.__new__(pyrad.PReq)
+    results = []
+    for name, content in sample_payloads(npackages):
+        new, old = _decode(Req, content)
+        assert new == old, name
+        t_old = min(timeit.repeat(lambda: legacy_parse(content), number=number, repeat=3)) / number * 1e6
+        t_new = min(timeit.repeat(lambda: Req._parse_result(content, 'utf-8'), number=number, repeat=3)) / number * 1e6
+        results.append({'payload': name, 'size': len(content), 'legacy_us': round(t_old, 2),
+                        'current_us': round(t_new, 2), 'speedup': round(t_old / t_new, 2)})
+    return results
+
+def print_table(rows):
+    "Print a list of dictionaries as a text table"
+    if not rows: return
+    keys = list(rows[0].keys())
+    widths = [max(len(str(k)), max(len(str(row[k])) for row in rows)) for k in keys]
+    print('  '.join(str(k).ljust(w) for k, w in zip(keys, widths)))
+    for row in rows:
+        print('  '.join(str(row[k]).ljust(w) for k, w in zip(keys, widths)))
+
+def _measure(name, server, func, ops=1):
+    """
+    Run 'func' once and return a result dictionary (benchmark, ops, seconds,
+    ops_per_sec, requests), where 'requests' is the number of calls served
+    by the fake server during the run.
+    """
+    ncalls = server.CallCount
+    t0 = time.time()
+    func()
+    dt = time.time() - t0
+    return {'benchmark': name, 'ops': ops, 'seconds': round(dt, 4),
+            'ops_per_sec': round(ops / dt, 1) if dt else None,
+            'requests': server.CallCount - ncalls}
+
+def bench_client(Latency=0.0, Packages=200, Components=10, number=500):
+    """
+    End-to-end benchmarks against a local fake DataSnap server
+    (see pyrad_fakeserver.FakeDSServer) with the given latency (seconds per call)
+    and payload sizes. Measures PReq.get_result and PReq.get_results calls/sec,
+    full PRPackages enumeration (with and without a snapshot), PRPackage.Components
+    fetching and PRObject.__str__. Request coalescing (see pyrad.PSingleFlight)
+    is enabled in the 'get_results (coalesced)' benchmark only, so that
+    every other call reaches the server. Returns a list of result dictionaries
+    (see _measure).
+    """
+    results = []
+    with FakeDSServer(Latency=Latency, Packages=Packages, Components=Components) as server:
+        PyRAD.Reload(server.DSConfig)
+        try:
+            Req = PyRAD.Req
+            results.append(_measure('get_result', server,
+                lambda: [Req.get_result('IDE_Packages_getCount') for _ in xrange(number)], number))
+            results.append(_measure('get_results', server,
+                lambda: Req.get_results(['IDE_Packages_getCount'] * number), number))
+            CReq = pyrad.PReq('CheckConnection', dict(server.DSConfig, Coalesce=True))
+            try:
+                results.append(_measure('get_results (coalesced)', server,
+                    lambda: CReq.get_results(['IDE_Packages_getCount'] * number), number))
+            finally:
+                CReq.close()
+            results.append(_measure('get_result (package info)', server,
+                lambda: [Req.get_result('IDE_Packages_getPackageInfo', i % Packages) for i in xrange(number)], number))
+            results.append(_measure('PRPackages enumeration', server,
+                lambda: [pk.Name for pk in PyRAD.PRPackages()], Packages))
+            results.append(_measure('PRPackages enumeration (snapshot)', server,
+                lambda: [pk.Name for pk in PyRAD.PRPackages(Snapshot=True)], Packages))
+            npackages = min(Packages, 20)
+            results.append(_measure('PRPackage.Components', server,
+                lambda: [list(PyRAD.PRPackage(i, package_info(i)).Components) for i in xrange(npackages)],
+                npackages * Components))
+            pk = PyRAD.PRPackage(0)
+            nstr = max(number // 10, 1)
+            results.append(_measure('PRObject.__str__', server,
+                lambda: [str(pk) for _ in xrange(nstr)], nstr))
+        finally:
+            PyRAD.Req.close()
+            PyRAD.Req = None
+    return results
+
+def bench_transports(Latency=0.0, number=500, Transports=None):
+    """
+    Compare the per-call overhead of the PReq transports (see pyrad.TRANSPORTS)
+    against a local fake DataSnap server: sequential get_result calls and a batch
+    of get_results (without request coalescing, so that every call reaches
+    the server). Transports that cannot be loaded (e.g. aiohttp is not installed)
+    are skipped. Returns a list of result dictionaries (see _measure) with the
+    transport name and the mean time per call ('us_per_call').
+    """
+    results = []
+    with FakeDSServer(Latency=Latency) as server:
+        for transport in (Transports or sorted(pyrad.TRANSPORTS)):
+            try:
+                Req = pyrad.PReq('CheckConnection', dict(server.DSConfig, Transport=transport))
+            except (ImportError, pyrad.EGenericError):
+                continue
+            try:
+                for name, func in (('get_result', lambda: [Req.get_result('IDE_Packages_getCount')
+                                                           for _ in xrange(number)]),
+                                   ('get_results', lambda: Req.get_results(['IDE_Packages_getCount'] * number))):
+                    row = _measure('{0} ({1})'.format(name, transport), server, func, number)
+                    row['transport'] = transport
+                    row['us_per_call'] = round(row['seconds'] / number * 1e6, 1)
+                    results.append(row)
+            finally:
+                Req.close()
+    return results
+
+STARTUP_SCRIPT = """
+import sys, json, time
+t0 = time.perf_counter() if hasattr(time, 'perf_counter') else time.time()
+timer = time.perf_counter if hasattr(time, 'perf_counter') else time.time
+sys.path.insert(0, sys.argv[1])
+import pyradclasses as PyRAD
+t1 = timer()
+PyRAD.Reload(json.loads(sys.argv[2]))
+t2 = timer()
+PyRAD.Req.get_result('IDE_Packages_getCount')
+t3 = timer()
+print(json.dumps([t1 - t0, t2 - t1, t3 - t2]))
+"""
+
+def bench_startup(Latency=0.0, number=5):
+    """
+    Measure the startup of a short-lived script (in a new Python process):
+    the time to import pyradclasses, to call Reload and to make the first call,
+    with the connection checked right away, deferred (LazyConnect) and skipped
+    thanks to a recent check by another process (ConnectionCache).
+    Returns a list of dictionaries (benchmark, import_ms, reload_ms, first_call_ms,
+    total_ms) with the median values of 'number' runs.
+    """
+    results = []
+    cachefile = os.path.join(tempfile.mkdtemp(), 'connections.json')
+    srcdir = os.path.dirname(os.path.abspath(__file__))
+    with FakeDSServer(Latency=Latency) as server:
+        modes = (('startup', {}),
+                 ('startup (LazyConnect)', {'LazyConnect': True}),
+                 ('startup (ConnectionCache)', {'ConnectionCache': cachefile}))
+        for name, config in modes:
+            DSConfig = json.dumps(dict(server.DSConfig, **config))
+            runs = []
+            for _ in xrange(number):
+                output = subprocess.check_output([sys.executable, '-c', STARTUP_SCRIPT, srcdir, DSConfig])
+                runs.append(json.loads(output.decode('utf-8')))
+            median = [sorted(run[i] for run in runs)[len(runs) // 2] * 1000 for i in range(3)]
+            results.append({'benchmark': name, 'import_ms': round(median[0], 2),
+                            'reload_ms': round(median[1], 2), 'first_call_ms': round(median[2], 2),
+                            'total_ms': round(sum(median), 2)})
+    os.remove(cachefile)
+    os.rmdir(os.path.dirname(cachefile))
+    return results
+
+def compare(old, new, threshold=0.1):
+    """
+    Compare two result files written by 'main' (as loaded dictionaries):
+    return a list of (section, benchmark, old, new, ratio, status) dictionaries,
+    where 'ratio' is new/old throughput (1/time for the decoding and startup benchmarks)
+    and status is 'REGRESSION' if the ratio is below 1 - threshold.
+    """
+    rows = []
+    sections = (('client', lambda row: row['benchmark'], 'ops_per_sec', False),
+                ('transports', lambda row: row['benchmark'], 'ops_per_sec', False),
+                ('startup', lambda row: row['benchmark'], 'total_ms', True),
+                ('decode', lambda row: '{0} ({1})'.format(row['payload'], row['backend']), 'current_us', True))
+    for section, key, value, inverse in sections:
+        olds = dict((key(row), row[value]) for row in old.get(section, []))
+        for row in new.get(section, []):
+            vold, vnew = olds.get(key(row)), row[value]
+            if not (vold and vnew): continue
+            ratio = round(vold / vnew if inverse else vnew / vold, 2)
+            rows.append({'section': section, 'benchmark': key(row), 'old': vold, 'new': vnew,
+                         'ratio': ratio, 'status': 'REGRESSION' if ratio < 1 - threshold else 'ok'})
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description='pyrad benchmarks (a local fake DataSnap server is used)')
+    parser.add_argument('-o', '--output', default='pyrad_bench.json',
+                        help='file to write the results to (JSON)')
+    parser.add_argument('-c', '--compare', metavar='FILE',
+                        help='results file of a previous run to compare with')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='fake server latency per call, seconds')
+    parser.add_argument('--packages', type=int, default=200, help='number of packages')
+    parser.add_argument('--components', type=int, default=10, help='number of components per package')
+    parser.add_argument('--number', type=int, default=500, help='number of calls in the call benchmarks')
+    parser.add_argument('--no-checks', action='store_true', help='skip the decoding correctness checks')
+    args = parser.parse_args()
+
+    if not args.no_checks:
+        print('Checked {0} payloads: decoded results are identical.'.format(check_decode()))
+        print('Checked {0} payloads: streamed items are identical.'.format(check_stream()))
+
+    results = {'meta': {'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                        'python': platform.python_version(),
+                        'platform': platform.platform(),
+                        'json_backends': [],
+                        'latency': args.latency, 'packages': args.packages,
+                        'components': args.components, 'number': args.number},
+               'client': [], 'transports': [], 'decode': [], 'startup': []}
+    for backend in ('json', 'orjson'):
+        try:
+            pyrad.set_json_backend(backend)
+        except pyrad.EGenericError:
+            continue
+        results['meta']['json_backends'].append(backend)
+        print('\nResponse decoding ({0} backend):'.format(backend))
+        rows = bench_decode()
+        print_table(rows)
+        results['decode'] += [dict(row, backend=backend) for row in rows]
+    pyrad.set_json_backend()
+
+    print('\nClient (latency = {0} s, {1} packages):'.format(args.latency, args.packages))
+    results['client'] = bench_client(args.latency, args.packages, args.components, args.number)
+    print_table(results['client'])
+
+    print('\nTransports (latency = {0} s):'.format(args.latency))
+    results['transports'] = bench_transports(args.latency, args.number)
+    print_table(results['transports'])
+
+    print('\nStartup (new process):')
+    results['startup'] = bench_startup(args.latency)
+    print_table(results['startup'])
+
+    with open(args.output, 'w') as ofile:
+        json.dump(results, ofile, indent=2)
+    print('\nResults written to {0}'.format(args.output))
+
+    if args.compare:
+        with open(args.compare) as ifile:
+            old = json.load(ifile)
+        rows = compare(old, results)
+        print('\nComparison with {0}:'.format(args.compare))
+        settings = ('latency', 'packages', 'components', 'number')
+        if any(old['meta'].get(k) != results['meta'][k] for k in settings):
+            print('WARNING: the runs used different settings ({0})!'.format(', '.join(settings)))
+        print_table(rows)
+        if any(row['status'] != 'ok' for row in rows): return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
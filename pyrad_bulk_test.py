@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyrad_bulk_test
+# Purpose:     tests of the bulk package operations (PRPackages.InstallMany,
+#              UninstallMany, SetLoadedMany) against the fake DataSnap server
+#              (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyradclasses as PyRAD
+import pytest
+
+#-------------------------------------------------------------------------------
+
+def test_waves():
+    deps = {'c': set(['b']), 'b': set(['a']), 'd': set()}
+    assert PyRAD._waves(['c', 'b', 'a', 'd'], deps) == [['a', 'd'], ['b'], ['c']]
+    # items in a cycle make the last wave
+    assert PyRAD._waves(['x', 'y', 'z'], {'x': set(['y']), 'y': set(['x'])}) == [['z'], ['x', 'y']]
+
+def test_install_many_waves(ide):
+    packages = PyRAD.PRPackages(Snapshot=True)
+    results = packages.InstallMany(['c:\\x\\new2.bpl', 'c:\\x\\new1.bpl'], Requires={'new2.bpl': ['new1']})
+    assert [(res.Ok, res.Wave) for res in results.values()] == [(True, 1), (True, 0)]
+    assert 'new1.bpl' in packages.PackageNames
+
+def test_install_many_skips_dependents(ide):
+    packages = PyRAD.PRPackages()
+    # the package is already installed, so installing it fails (returns False)
+    results = packages.InstallMany(['c:\\x\\new2.bpl', 'c:\\x\\dclpackage1_250.bpl'],
+                                   Requires={'new2': ['dclpackage1_250']})
+    assert not results['c:\\x\\dclpackage1_250.bpl'].Ok
+    assert isinstance(results['c:\\x\\new2.bpl'].Error, PyRAD.EPRError)
+    assert 'new2.bpl' not in packages
+
+def test_uninstall_many_waves(ide):
+    ide.IDE.Packages[2]['RequiresList'] = ['dclpackage1_250']
+    packages = PyRAD.PRPackages(Snapshot=True)
+    results = packages.UninstallMany(['dclpackage1_250.bpl', 'dclpackage2_250.bpl', 'missing.bpl'])
+    assert [res.Wave for res in results.values() if res.Ok] == [1, 0]
+    assert isinstance(results['missing.bpl'].Error, PyRAD.EPRError)
+    assert len(packages) == 8
+
+@pytest.mark.parametrize('snapshot', [False, True])
+def test_set_loaded_many(ide, snapshot):
+    ide.IDE.Packages[3]['RequiresList'] = ['dclpackage1_250']
+    packages = PyRAD.PRPackages(Snapshot=snapshot)
+    results = packages.SetLoadedMany(['dclpackage3_250.bpl', 'dclpackage1_250.bpl'], False)
+    # the requiring package is unloaded first
+    assert [(res.Ok, res.Wave) for res in results.values()] == [(True, 0), (True, 1)]
+    assert not packages.GetPackage(1).Loaded and not packages.GetPackage(3).Loaded
+    assert [pkinfo['Loaded'] for pkinfo in ide.IDE.Packages[1:4:2]] == [False, False]
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyrad_cache_test
+# Purpose:     tests of the response cache of PReq (see PResultCache)
+#              against the fake DataSnap server (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyrad, time, pytest
+
+#-------------------------------------------------------------------------------
+
+def test_cache(server, connect):
+    Req = connect(server, CacheSize=100)
+    assert Req.get_result('IDE_Packages_getCount') == 10
+    assert Req.get_result('IDE_Packages_getCount') == 10
+    assert server.Calls['IDE_Packages_getCount'] == 1
+    assert Req.cache_stats()['hits'] == 1
+    # a write call drops the cached responses it may change
+    Req.get_result('IDE_Packages_Install', 'c:\\x\\new1.bpl')
+    assert Req.get_result('IDE_Packages_getCount') == 11
+    assert server.Calls['IDE_Packages_getCount'] == 2
+    # error messages are not cached
+    Req.get_result('IDE_Packages_getPackageInfo', 99)
+    Req.get_result('IDE_Packages_getPackageInfo', 99)
+    assert server.Calls['IDE_Packages_getPackageInfo'] == 2
+
+def test_cache_ttl(server, connect):
+    Req = connect(server, CacheSize=100, CacheTTL=0.05)
+    Req.get_result('IDE_Packages_getCount')
+    time.sleep(0.1)
+    Req.get_result('IDE_Packages_getCount')
+    assert server.Calls['IDE_Packages_getCount'] == 2
+
+@pytest.mark.parametrize('options', [{'requesttype': 'get'}, {'quotemethod': False}])
+def test_cache_options(server, connect, options):
+    Req = connect(server, CacheSize=100)
+    Req.get_result('IDE_Packages_getCount')
+    # calls with other request options do not share the cached response
+    for _ in range(2): Req.get_result('IDE_Packages_getCount', **dict(options))
+    assert server.Calls['IDE_Packages_getCount'] == 3
+    Req.get_result('IDE_Packages_getCount')
+    assert server.Calls['IDE_Packages_getCount'] == 3
+
+def test_cache_keys():
+    cache = pyrad.PResultCache(2)
+    assert cache.key('IDE_Packages_Install', ('a.bpl',), {}) is None
+    assert cache.key('IDE_Packages_getCount', (), {'timeout': 1}) is None
+    key = cache.key('IDE_Packages_getCompCount', (1,), {})
+    cache.put(key, (b'1', 'utf-8'), cache.generation(key))
+    assert cache.get(key) == (b'1', 'utf-8')
+    cache.invalidate('IDE_Packages_Install')
+    assert cache.get(key) is None
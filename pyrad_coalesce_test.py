@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyrad_coalesce_test
+# Purpose:     tests of the coalescing of concurrent identical reads
+#              (see PSingleFlight) against the fake DataSnap server (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyrad, threading, time, pytest
+from pyrad_fakeserver import FakeDSServer
+
+#-------------------------------------------------------------------------------
+
+def start(func, *args, **kwargs):
+    "Run func(*args, **kwargs) in a new thread; return the thread and the list receiving the result or exception"
+    results = []
+    def run():
+        try:
+            results.append(func(*args, **kwargs))
+        except Exception as err:
+            results.append(err)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, results
+
+def concurrent_reads(Req, n=8):
+    started = [start(Req.get_result, 'IDE_Packages_getCount') for _ in range(n)]
+    for thread, _ in started: thread.join()
+    return [results[0] for _, results in started]
+
+def test_coalescing(slow_server, connect):
+    Req = connect(slow_server, Coalesce=True)
+    assert concurrent_reads(Req) == [10] * 8
+    assert slow_server.Calls['IDE_Packages_getCount'] == 1
+    assert Req.coalesce_stats()['coalesced'] == 7
+
+def test_no_coalescing_by_default(slow_server, connect):
+    Req = connect(slow_server)
+    assert concurrent_reads(Req) == [10] * 8
+    assert slow_server.Calls['IDE_Packages_getCount'] == 8
+    assert Req.coalesce_stats() is None
+
+def test_reads_after_write_sent_anew(connect):
+    with FakeDSServer(Packages=10, Latency=0.6, Serial=False) as server:
+        Req = connect(server, Coalesce=True)
+        write = start(Req.get_result, 'IDE_Packages_Install', 'c:\\x\\new1.bpl')
+        time.sleep(0.15)
+        # a read started while the write is in progress...
+        read = start(Req.get_result, 'IDE_Packages_getCount')
+        write[0].join()
+        # ...is not shared with the reads made after the write has completed
+        assert Req.get_result('IDE_Packages_getCount') == 11
+        read[0].join()
+        assert server.Calls['IDE_Packages_getCount'] == 2
+
+def test_followers_released_on_leader_error(slow_server, connect):
+    Req = connect(slow_server, Coalesce=True)
+    make_url, built = Req._make_url, []
+    def failing(*args):
+        # the url of the first (leading) call fails to be built
+        built.append(1)
+        if len(built) == 1:
+            time.sleep(0.2)
+            raise ValueError('bad url')
+        return make_url(*args)
+    Req._make_url = failing
+    leader = start(Req.get_result, 'IDE_Packages_getCount')
+    time.sleep(0.05)
+    follower = start(Req.get_result, 'IDE_Packages_getCount', deadline=5)
+    for thread in (leader[0], follower[0]): thread.join()
+    for results in (leader[1], follower[1]):
+        assert isinstance(results[0], pyrad.EGenericError)
+        assert not isinstance(results[0], pyrad.ETimeoutError)
+    assert Req.coalesce_stats() == {'flights': 1, 'coalesced': 1, 'inflight': 0}
+
+def test_async_coalescing(slow_server):
+    pyradasync = pytest.importorskip('pyradasync')
+    asyncio = pyradasync.asyncio
+    async def main():
+        async with pyradasync.AsyncPReq('', dict(slow_server.DSConfig, Coalesce=True)) as Req:
+            return await Req.get_results(['IDE_Packages_getCount'] * 8)
+    assert asyncio.run(main()) == [10] * 8
+    assert slow_server.Calls['IDE_Packages_getCount'] == 1
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyrad_components_test
+# Purpose:     tests of the lazy component name sequences (PRComponents)
+#              against the fake DataSnap server (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyradclasses as PyRAD
+import pytest
+from pyrad_fakeserver import FakeDSServer
+
+#-------------------------------------------------------------------------------
+
+def test_components(ide):
+    components = PyRAD.PRComponents(2, PyRAD.Req)
+    assert len(components) == 5
+    assert components[-1] == 'TDclpackage2Component4'
+    assert list(components) == components[:]
+
+def test_components_error(ide):
+    with pytest.raises(PyRAD.EPRError):
+        len(PyRAD.PRComponents(99, PyRAD.Req))
+
+def test_components_fetched_in_chunks(connect):
+    with FakeDSServer(Packages=2, Components=100) as Server:
+        Req = connect(Server)
+        components = PyRAD.PRComponents(1, Req)
+        assert components[40] == 'TDclpackage1Component40'
+        # only the chunk of the accessed item is retrieved
+        assert Server.Calls['IDE_Packages_getCompName'] == PyRAD.PRComponents.ChunkSize
+        assert components[33:35] == ['TDclpackage1Component33', 'TDclpackage1Component34']
+        assert len(list(components)) == 100
+        assert Server.Calls['IDE_Packages_getCompName'] == 100
+        list(components)
+        assert Server.Calls['IDE_Packages_getCompName'] == 100
+
+def test_package_components(ide):
+    pk = PyRAD.PRPackages().GetPackage(3)
+    assert pk.ComponentCount == 5
+    assert pk.Components[0] == 'TDclpackage3Component0'
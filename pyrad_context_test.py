@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyrad_context_test
+# Purpose:     tests of the client selection of the PyRAD objects (Reload,
+#              Connect, Use, Current) against fake DataSnap servers (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyradclasses as PyRAD
+import threading, pytest
+from pyrad_fakeserver import FakeDSServer
+
+#-------------------------------------------------------------------------------
+
+@pytest.fixture
+def other_server():
+    "Second fake server (with 3 packages)"
+    with FakeDSServer(Packages=3) as Server:
+        yield Server
+
+def test_no_client(monkeypatch):
+    monkeypatch.setattr(PyRAD, 'Req', None)
+    assert PyRAD.Current() is None
+    with pytest.raises(PyRAD.EPRError):
+        PyRAD.PRPackages()
+
+def test_connect_keeps_global(ide, other_server):
+    Req = PyRAD.Connect(other_server.DSConfig)
+    try:
+        assert PyRAD.Current() is PyRAD.Req is not Req
+        assert PyRAD.PRPackages(Req=Req).Count == 3
+        assert PyRAD.PRPackages().Count == 10
+    finally:
+        Req.close()
+
+def test_use(ide, other_server):
+    Req = PyRAD.Connect(other_server.DSConfig)
+    try:
+        with PyRAD.Use(Req) as Client:
+            assert Client is Req and PyRAD.Current() is Req
+            packages = PyRAD.PRPackages()
+            with PyRAD.Use(PyRAD.Req):
+                assert PyRAD.PRPackages().Count == 10
+            assert PyRAD.Current() is Req
+        assert PyRAD.Current() is PyRAD.Req
+        # the objects keep their client after the block
+        assert packages.Count == 3
+    finally:
+        Req.close()
+
+def test_use_per_thread(ide, other_server):
+    Req = PyRAD.Connect(other_server.DSConfig)
+    counts = {}
+    def count(name):
+        counts[name] = PyRAD.PRPackages().Count
+    try:
+        with PyRAD.Use(Req):
+            thread = threading.Thread(target=count, args=('other thread',))
+            thread.start()
+            thread.join()
+            count('this thread')
+    finally:
+        Req.close()
+    assert counts == {'other thread': 10, 'this thread': 3}
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyrad_decode_test
+# Purpose:     tests of the response decoding of PReq (JSON backends, scalar
+#              results, streamed responses) (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyrad, pyrad_bench, pytest
+from pyrad_fakeserver import encode_result
+
+#-------------------------------------------------------------------------------
+
+@pytest.mark.parametrize('backend', ['json', 'orjson'])
+def test_decoding(backend):
+    try:
+        pyrad.set_json_backend(backend)
+    except pyrad.EGenericError:
+        pytest.skip('{0} is not installed'.format(backend))
+    try:
+        assert pyrad_bench.check_decode(2000) > 2000
+        assert pyrad_bench.check_stream(200) > 0
+    finally:
+        pyrad.set_json_backend()
+
+def test_scalar_results(server, connect):
+    Req = connect(server)
+    assert Req.get_result('IDE_Packages_getPackageInfoValue', 1, 'Loaded') is True
+    assert Req.get_result('IDE_Packages_getPackageInfoValue', 1, 'Name') == 'dclpackage1_250.bpl'
+    assert Req.get_result('IDE_Packages_getCompCount', 99) == 'ERROR: Wrong package index 99!'
+
+@pytest.mark.parametrize('result', [['a', 'b c', u'\u00e9', '{[,]}', 'x\\y'], u'line 1\r\nline 2\r\n\u00e9',
+                                    {'Name': 'x', 'List': [1, 2]}])
+def test_stream_decoder(server, connect, result):
+    Req = connect(server)
+    content = encode_result(result)
+    decoder = pyrad.PStreamDecoder(Req._parse_result)
+    items = []
+    for i in range(len(content)): items.extend(decoder.feed(content[i:i + 1]))
+    items.extend(decoder.close())
+    parsed = Req._parse_result(content, 'utf-8')
+    if isinstance(parsed, list): assert items == parsed
+    elif isinstance(parsed, dict): assert items == [parsed]
+    else: assert items == parsed.splitlines()
@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyrad_fakeserver
+# Purpose:     local stand-in for a RAD Studio DataSnap REST server
+#              (used by the benchmarks, no IDE required)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+from __future__ import print_function
+import sys, json, time, base64, socket, inspect, threading
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import unquote
+except ImportError:
+    # Python 2.x
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urllib import unquote
+
+#-------------------------------------------------------------------------------
+
+def encode_result(value, ensure_ascii=True):
+    """
+    Encode a function result the way DataSnap does: objects and arrays
+    are serialized to a JSON string that is then wrapped in {"result":[...]}.
+    """
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=ensure_ascii)
+    return json.dumps({'result': [value]}, ensure_ascii=ensure_ascii,
+                      separators=(',', ':')).encode('utf-8')
+
+def encode_error(message):
+    "Encode an error response"
+    return json.dumps({'error': message}, separators=(',', ':')).encode('utf-8')
+
+def package_info(index, ncomponents=3):
+    "Sample package info (IDE_Packages_getPackageInfo)"
+    name = 'dclpackage{0}_250.bpl'.format(index)
+    return {'FileName': 'c:\\program files (x86)\\embarcadero\\studio\\23.0\\bin\\' + name,
+            'Name': name, 'Description': 'Sample design-time package #{0}'.format(index),
+            'Producer': 'Embarcadero', 'Consumer': 'RAD Studio',
+            'SymbolFileName': 'dclpackage{0}'.format(index),
+            'RuntimeOnly': False, 'DesigntimeOnly': True, 'IDEPackage': False,
+            'Loaded': bool(index % 2), 'ContainsList': ['Unit{0}'.format(i) for i in range(5)],
+            'RequiresList': ['rtl', 'vcl', 'designide'], 'ImplicitList': [],
+            'RequiredByList': [], 'ComponentCount': ncomponents}
+
+def main_menu(nitems, actions=False):
+    """
+    Sample main menu text (IDE_MainMenu_getValue/MainMenuString): top-level
+    captions followed by their items indented by two spaces. If 'actions'
+    is True, action names are appended to the item captions in square
+    brackets (as written by IDE_MainMenu_WriteActionsToFile).
+    """
+    lines = []
+    for i in range(nitems):
+        if i % 10 == 0: lines.append('Menu{0}'.format(i // 10))
+        lines.append('  Item {0}.{1}'.format(i // 10, i) +
+                     (' [Action{0}_{1}]'.format(i // 10, i) if actions else ''))
+    return '\r\n'.join(lines)
+
+environment = {'BaseRegistryKey': 'Software\\Embarcadero\\BDS\\23.0',
+               'ProductIdentifier': 'Delphi', 'ParentHandle': 65812,
+               'ActiveDesignerType': 'VCL',
+               'RootDirectory': 'c:\\program files (x86)\\embarcadero\\studio\\23.0\\',
+               'BinDirectory': 'c:\\program files (x86)\\embarcadero\\studio\\23.0\\bin\\',
+               'TemplateDirectory': 'c:\\program files (x86)\\embarcadero\\studio\\23.0\\ObjRepos\\',
+               'ApplicationDataDirectory': 'c:\\users\\user\\appdata\\roaming\\embarcadero\\bds\\23.0\\',
+               'LocalApplicationDataDirectory': 'c:\\users\\user\\appdata\\local\\embarcadero\\bds\\23.0\\',
+               'IDEPreferredUILanguages': 'en', 'StartupDirectory': 'c:\\users\\user\\documents\\'}
+
+#-------------------------------------------------------------------------------
+
+class FakeIDE(object):
+    """
+    In-memory IDE state served by FakeDSServer: a package collection,
+    the environment and the main menu. Each public method named after
+    a server method (e.g. IDE_Packages_getCount) receives the URL
+    arguments as strings and returns the result value.
+    """
+    def __init__(self, Packages=300, Components=10, MenuItems=1000):
+        self.Packages = [package_info(i, Components) for i in range(Packages)]
+        self.MenuItems = MenuItems
+        self.ErrorMsg = ''
+        self.Actions = set('Action{0}_{1}'.format(i // 10, i) for i in range(MenuItems))
+        self.Actions.update(('FileSaveAllCommand', 'FileCloseAllCommand'))
+
+    def _package(self, index):
+        index = int(index)
+        if not (0 <= index < len(self.Packages)):
+            raise IndexError('Wrong package index {0}!'.format(index))
+        return self.Packages[index]
+
+    def _find(self, fname):
+        name = fname.replace('\\', '/').rsplit('/', 1)[-1].lower()
+        for i, pk in enumerate(self.Packages):
+            if pk['Name'].lower() == name: return i
+        return -1
+
+    def CheckConnection(self):
+        return True
+
+    def IDE_Packages_getCount(self):
+        return len(self.Packages)
+
+    def IDE_Packages_getPackagesValue(self, key):
+        if key == 'PackageNames': return [pk['Name'] for pk in self.Packages]
+        if key == 'ErrorMsg': return self.ErrorMsg
+        raise KeyError(key)
+
+    def IDE_Packages_getPackageInfo(self, index):
+        pkinfo = dict(self._package(index))
+        del pkinfo['ComponentCount']
+        return pkinfo
+
+    def IDE_Packages_getPackageInfoValue(self, index, key):
+        return self.ErrorMsg if key == 'ErrorMsg' else self._package(index)[key]
+
+    def IDE_Packages_getCompCount(self, index):
+        return self._package(index)['ComponentCount']
+
+    def IDE_Packages_getCompName(self, index, compindex):
+        pk = self._package(index)
+        if not (0 <= int(compindex) < pk['ComponentCount']):
+            raise IndexError('Wrong component index {0}!'.format(compindex))
+        return 'T{0}Component{1}'.format(pk['SymbolFileName'].capitalize(), compindex)
+
+    def IDE_Packages_ToggleLoaded(self, index, loaded):
+        self._package(index)['Loaded'] = (loaded.lower() == 'true')
+        return True
+
+    def IDE_Packages_Install(self, fname):
+        if self._find(fname) >= 0: return False
+        name = fname.replace('\\', '/').rsplit('/', 1)[-1]
+        pkinfo = package_info(len(self.Packages), 0)
+        pkinfo.update(FileName=fname, Name=name, SymbolFileName=name.rsplit('.', 1)[0])
+        self.Packages.append(pkinfo)
+        return True
+
+    def IDE_Packages_Uninstall(self, fname):
+        index = self._find(fname)
+        if index < 0: return False
+        del self.Packages[index]
+        return True
+
+    def IDE_Common_getEnvironment(self):
+        return environment
+
+    def IDE_Common_getExpandRootMacro(self, macro):
+        return macro.replace('$(BDS)', environment['RootDirectory'].rstrip('\\'))
+
+    def IDE_Common_IsProject(self, fname):
+        return fname.lower().endswith(('.dproj', '.cbproj'))
+
+    def IDE_Common_IsProjectGroup(self, fname):
+        return fname.lower().endswith('.groupproj')
+
+    def IDE_Actions_OpenFile(self, fname): return True
+    def IDE_Actions_CloseFile(self, fname): return True
+    def IDE_Actions_SaveFile(self, fname): return True
+    def IDE_Actions_ReloadFile(self, fname): return True
+    def IDE_Actions_OpenProject(self, fname, newgroup='true'): return True
+
+    def IDE_MainMenu_getValue(self, key):
+        if key == 'MainMenuString': return main_menu(self.MenuItems)
+        if key == 'ErrorMsg': return self.ErrorMsg
+        raise KeyError(key)
+
+    def IDE_MainMenu_WriteToFile(self, fname):
+        with open(fname, 'w') as ofile: ofile.write(main_menu(self.MenuItems))
+        return True
+
+    def IDE_MainMenu_WriteActionsToFile(self, fname):
+        with open(fname, 'w') as ofile: ofile.write(main_menu(self.MenuItems, True))
+        return True
+
+    def IDE_MainMenu_ExecuteMenuItem(self, text, delimiter='|'):
+        return len(text.split(delimiter)) == 2 and text.startswith('Menu')
+
+    def IDE_MainMenu_ExecuteAction(self, action):
+        return action in self.Actions
+
+# DBX types of the method parameters and results served by FakeDSAdmin
+_DBXTYPES = {'string': 26, 'Integer': 6, 'Boolean': 4}
+_PARAMTYPES = {'index': 'Integer', 'compindex': 'Integer', 'loaded': 'Boolean', 'newgroup': 'Boolean'}
+
+def _returntype(func_name):
+    "Result type of a FakeIDE method (for FakeDSAdmin)"
+    if func_name in ('IDE_Packages_getCount', 'IDE_Packages_getCompCount'): return 'Integer'
+    if func_name.startswith(('IDE_Actions_', 'IDE_Common_Is', 'IDE_MainMenu_Write', 'IDE_MainMenu_Execute')) or \
+       func_name in ('CheckConnection', 'IDE_Packages_Install', 'IDE_Packages_Uninstall', 'IDE_Packages_ToggleLoaded'):
+        return 'Boolean'
+    return 'string'
+
+def _table(columns, rows):
+    "DBX reader in the DataSnap JSON format: column descriptions + column values"
+    table = {'table': [[name, _DBXTYPES[ctype], 0, 0, 0, 0, 0, 0, False, False, 0, False, False]
+                       for name, ctype in columns]}
+    for i, (name, _) in enumerate(columns):
+        table[name] = [row[i] for row in rows]
+    return table
+
+class FakeDSAdmin(object):
+    """
+    DSAdmin methods of FakeDSServer describing the FakeIDE methods
+    (served at '<URL prefix>/DSAdmin/<method>', e.g. 'datasnap/rest/DSAdmin/GetServerMethods').
+    """
+    def __init__(self, IDE, ServerClass):
+        self.IDE = IDE
+        self.ServerClass = ServerClass
+
+    def _methods(self):
+        for func_name in sorted(dir(self.IDE)):
+            func = getattr(self.IDE, func_name)
+            if func_name.startswith(('IDE_', 'CheckConnection')) and callable(func):
+                argspec = getattr(inspect, 'getfullargspec', getattr(inspect, 'getargspec', None))(func)
+                yield func_name, argspec.args[1:]
+
+    def GetServerMethods(self):
+        return _table((('MethodAlias', 'string'), ('ServerClassName', 'string'), ('RoleName', 'string')),
+                      [('{0}.{1}'.format(self.ServerClass, func_name), self.ServerClass, '')
+                       for func_name, _ in self._methods()])
+
+    def GetServerMethodParameters(self):
+        rows = []
+        for func_name, args in self._methods():
+            alias = '{0}.{1}'.format(self.ServerClass, func_name)
+            for arg in args:
+                ptype = _PARAMTYPES.get(arg, 'string')
+                rows.append((alias, arg, 1, _DBXTYPES[ptype], ptype))
+            rtype = _returntype(func_name)
+            rows.append((alias, 'ReturnParameter', 4, _DBXTYPES[rtype], rtype))
+        return _table((('MethodAlias', 'string'), ('ParameterName', 'string'), ('ParameterDirection', 'Integer'),
+                       ('DBXType', 'Integer'), ('TypeName', 'string')), rows)
+
+#-------------------------------------------------------------------------------
+
+class _FakeDSHandler(BaseHTTPRequestHandler):
+    "Request handler of FakeDSServer"
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server.owner
+        length = int(self.headers.get('Content-Length') or 0)
+        if length: self.rfile.read(length)
+        if server.Auth and (self.headers.get('Authorization') != server.Auth):
+            return self.__send(401, encode_error('Unauthorized'))
+        # /<URL>/"FuncName"/arg1/arg2/...
+        path = self.path.split('?', 1)[0]
+        if path.startswith(server.AdminPrefix):
+            # DSAdmin results are JSON objects (not double-encoded)
+            func = getattr(server.Admin, path[len(server.AdminPrefix):].strip('/"'), None)
+            if (func is None) or path[len(server.AdminPrefix):].startswith('_'):
+                return self.__send(404, encode_error('Not found'))
+            return self.__send(200, json.dumps({'result': [func()]}, separators=(',', ':')).encode('utf-8'))
+        if not path.startswith(server.Prefix):
+            return self.__send(404, encode_error('Not found'))
+        parts = [unquote(part) for part in path[len(server.Prefix):].split('/')]
+        func_name, args = parts[0].strip('"'), parts[1:]
+        if args and args[-1] == '': args.pop()
+        func = getattr(server.IDE, func_name, None) if not func_name.startswith('_') else None
+        if func is None:
+            return self.__send(404, encode_error('Method {0} not found'.format(func_name)))
+        with server.Lock:
+            if server.Latency: time.sleep(server.Latency)
+            server.Calls[func_name] = server.Calls.get(func_name, 0) + 1
+            try:
+                body = encode_result(func(*args), server.EnsureAscii)
+            except Exception as err:
+                server.IDE.ErrorMsg = str(err)
+                body = encode_error(str(err))
+        self.__send(200, body)
+
+    do_GET = do_POST
+
+    def __send(self, code, body):
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def handle_error(self, request, client_address):
+        # clients that have timed out close the connection before the response
+        if not isinstance(sys.exc_info()[1], socket.error):
+            HTTPServer.handle_error(self, request, client_address)
+
+class FakeDSServer(object):
+    """
+    Local stand-in for a RAD Studio DataSnap REST server that serves the
+    IDE_Packages_*, IDE_Common_*, IDE_Actions_* and IDE_MainMenu_* methods
+    (see FakeIDE) with DataSnap's double-encoded JSON results, and their
+    descriptions by the DSAdmin methods (see FakeDSAdmin).
+    Parameters:
+        * Hostname, Port:   address to listen on (Port = 0 - any free port)
+        * URL:              DataSnap URL (e.g. 'datasnap/rest/TServerClass')
+        * Login, Password:  required Basic authorization (None - no authorization)
+        * Latency:          delay in seconds added to each call
+        * Serial:           if True, calls are served one at a time (like the IDE),
+                            otherwise concurrently (Latency is then overlapped)
+        * Packages, Components, MenuItems: payload sizes (see FakeIDE)
+    Usage:
+        with FakeDSServer(Latency=0.001) as Server:
+            PyRAD.Reload(Server.DSConfig)
+    """
+    def __init__(self, Hostname='127.0.0.1', Port=0, URL='datasnap/rest/TServerClass',
+                 Login=None, Password=None, Latency=0.0, Serial=True,
+                 Packages=300, Components=10, MenuItems=1000, EnsureAscii=True):
+        self.IDE = FakeIDE(Packages, Components, MenuItems)
+        self.URL = URL.strip('/')
+        self.Prefix = '/' + self.URL + '/'
+        self.AdminPrefix = '/' + self.URL.rsplit('/', 1)[0] + '/DSAdmin/'
+        self.Admin = FakeDSAdmin(self.IDE, self.URL.rsplit('/', 1)[-1])
+        self.Login, self.Password = Login, Password
+        self.Auth = 'Basic ' + base64.b64encode('{0}:{1}'.format(Login, Password).encode('utf-8')).decode('ascii') \
+                    if Login is not None else None
+        self.Latency = Latency
+        self.EnsureAscii = EnsureAscii
+        self.Lock = threading.Lock() if Serial else _NoLock()
+        self.Calls = {}
+        self._server = _ThreadingHTTPServer((Hostname, Port), _FakeDSHandler)
+        self._server.owner = self
+        self.Hostname, self.Port = self._server.server_address[:2]
+        self._thread = None
+
+    @property
+    def DSConfig(self):
+        "Settings dictionary to pass to PReq / pyradclasses.Reload"
+        DSConfig = {'Hostname': self.Hostname, 'Port': self.Port, 'URL': self.URL}
+        if self.Login is not None: DSConfig.update(Login=self.Login, Password=self.Password)
+        return DSConfig
+
+    @property
+    def CallCount(self):
+        "Total number of served calls"
+        return sum(self.Calls.values())
+
+    def start(self):
+        "Start serving in a background thread"
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        "Stop serving and close the socket"
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+class _NoLock(object):
+    "Dummy lock for FakeDSServer(Serial=False)"
+    def __enter__(self): return self
+    def __exit__(self, exc_type, exc_value, traceback): return False
+
+#-------------------------------------------------------------------------------
+
+def main():
+    # Commandline args: [port [latency]]
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 5555
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    server = FakeDSServer(Port=port, Latency=latency)
+    print('Fake DataSnap server at http://{0}:{1}{2}'.format(server.Hostname, server.Port, server.Prefix))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
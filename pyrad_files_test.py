@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyrad_files_test
+# Purpose:     tests of the bulk file operations and the project scan
+#              (PRCommon.OpenFiles, ScanProjects) against the fake DataSnap
+#              server (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyradclasses as PyRAD
+import os
+
+#-------------------------------------------------------------------------------
+
+def test_bulk_files(ide):
+    results = PyRAD.PRCommon().OpenFiles(['a.pas', 'b.pas'])
+    assert list(results.items()) == [('a.pas', True), ('b.pas', True)]
+
+def test_scan_projects(ide, tmp_path, monkeypatch):
+    # local paths hold '/', which the fake server does not accept in arguments
+    for fname in ('a.dproj', 'b.groupproj', 'c.txt', os.path.join('sub', 'd.cbproj')):
+        tmp_path.joinpath(fname).parent.mkdir(exist_ok=True)
+        tmp_path.joinpath(fname).write_text(u'')
+    checked = []
+    def get_results(calls):
+        checked.extend(calls)
+        return [True if not args[0].endswith('.cbproj') else 'ERROR: failed' for _, args in calls]
+    monkeypatch.setattr(PyRAD.Req, 'get_results', get_results)
+    found = dict((os.path.relpath(fname, str(tmp_path)), kind)
+                 for fname, kind in PyRAD.PRCommon().ScanProjects(str(tmp_path)))
+    assert len(checked) == 3
+    assert found['a.dproj'] == 'project' and found['b.groupproj'] == 'projectgroup'
+    assert isinstance(found[os.path.join('sub', 'd.cbproj')], PyRAD.EPRError)
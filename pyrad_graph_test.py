@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyrad_graph_test
+# Purpose:     tests of the package dependency graph (PRPackageGraph) against
+#              the fake DataSnap server (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyradclasses as PyRAD
+import pytest
+
+#-------------------------------------------------------------------------------
+
+@pytest.fixture
+def graph_server(ide):
+    ide.IDE.Packages[1]['RequiresList'] = ['rtl', 'dclpackage0_250']
+    ide.IDE.Packages[2]['RequiresList'] = ['dclpackage1_250']
+    return ide
+
+def test_graph(graph_server):
+    graph = PyRAD.PRPackageGraph()
+    assert graph.RequiredBy('dclpackage0_250.bpl') == ['dclpackage1_250.bpl', 'dclpackage2_250.bpl']
+    assert graph.Requires('dclpackage2_250.bpl', Transitive=False) == ['dclpackage1_250.bpl']
+    order = graph.LoadOrder(['dclpackage2_250.bpl'])
+    assert order.index('dclpackage0_250.bpl') < order.index('dclpackage1_250.bpl') < order.index('dclpackage2_250.bpl')
+    assert not graph.HasCycle()
+
+def test_graph_from_iterated_snapshot(graph_server):
+    packages = PyRAD.PRPackages(Snapshot=True)
+    list(packages)
+    for _ in range(len(packages)): packages.next()
+    assert len(PyRAD.PRPackageGraph(packages)) == 10
+
+def test_graph_cycle_and_sync(graph_server):
+    graph_server.IDE.Packages[0]['RequiresList'] = ['dclpackage2_250']
+    graph = PyRAD.PRPackageGraph()
+    assert sorted(graph.Cycles()[0]) == ['dclpackage0_250.bpl', 'dclpackage1_250.bpl', 'dclpackage2_250.bpl']
+    PyRAD.Req.get_result('IDE_Packages_Uninstall', 'dclpackage1_250.bpl')
+    graph.sync()
+    assert not graph.HasCycle()
+    assert not graph.IsInstalled('dclpackage1_250.bpl')
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyrad_handle_test
+# Purpose:     tests of the lightweight package handles (PRPackageHandle) and
+#              package info records against the fake DataSnap server (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyradclasses as PyRAD
+import pytest
+
+#-------------------------------------------------------------------------------
+
+@pytest.mark.parametrize('name', ['dclpackage3_250.bpl', 'DCLPACKAGE3_250.BPL', 'c:\\x\\dclpackage3_250.bpl'])
+def test_handle_name_forms(ide, name):
+    pk = PyRAD.PRPackageHandle(3, name)
+    assert pk.FileName.endswith('\\dclpackage3_250.bpl')
+    assert pk.Index == 3
+
+def test_handle_is_lazy(ide):
+    ncalls = ide.CallCount
+    handles = PyRAD.PRPackages().GetHandles()
+    assert [pk.Name for pk in handles] == ['dclpackage{0}_250.bpl'.format(i) for i in range(10)]
+    assert ide.CallCount == ncalls + 1
+    assert handles[1].Loaded is True
+    assert ide.CallCount == ncalls + 2
+
+def test_handle_follows_moved_package(ide):
+    pk = PyRAD.PRPackageHandle(3, 'dclpackage3_250.bpl')
+    PyRAD.Req.get_result('IDE_Packages_Uninstall', 'dclpackage0_250.bpl')
+    assert pk.Name == 'dclpackage3_250.bpl'
+    assert pk.FileName.endswith('\\dclpackage3_250.bpl')
+    assert pk.Index == 2
+
+def test_handle_of_uninstalled_package(ide):
+    pk = PyRAD.PRPackageHandle(3, 'dclpackage3_250.bpl')
+    PyRAD.Req.get_result('IDE_Packages_Uninstall', 'dclpackage3_250.bpl')
+    assert pk.Reload(3) is False
+    assert pk.Index == -1
+
+def test_info_strings_interned(ide):
+    infos = [PyRAD.PRPackageHandle(i).Info for i in range(2)]
+    assert infos[0].RequiresList[0] is infos[1].RequiresList[0]
+    path = PyRAD.path.dirname(infos[0].FileName)
+    assert PyRAD._intern(path) is PyRAD._intern(''.join(path))
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyrad_menu_test
+# Purpose:     tests of the indexed IDE main menu (PRMenuIndex, PRMainMenu.GetIndex)
+#              against the fake DataSnap server (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyradclasses as PyRAD
+import pytest
+
+#-------------------------------------------------------------------------------
+
+@pytest.fixture
+def actions_file(tmp_path, monkeypatch):
+    # a bare file name: the fake server does not accept '/' in arguments
+    monkeypatch.chdir(tmp_path)
+    return 'actions.txt'
+
+def menu_reads(Server):
+    return Server.Calls.get('IDE_MainMenu_getValue', 0)
+
+def test_menu_index(ide):
+    index = PyRAD.PRMainMenu().GetIndex()
+    assert len(index) == 1100
+    assert index.find('Menu1|Item 1.12').Path == 'Menu1|Item 1.12'
+    assert 'menu1|ITEM 1.12' in index
+    assert 'Menu1|Item 2.20' not in index
+    assert [item.Caption for item in index.complete('Menu1|Item 1.1')] == ['Item 1.{0}'.format(i) for i in range(10, 20)]
+    assert index.search('Item 1.15', 1)[0].Caption == 'Item 1.15'
+    assert len(index.Fingerprint) == 40
+
+def test_index_updated_on_change(ide):
+    menu = PyRAD.PRMainMenu()
+    index = menu.GetIndex()
+    fingerprint, root = index.Fingerprint, index.Root
+    assert menu.GetIndex() is index and index.Root is root
+    assert menu.GetIndex(Update=False) is index
+    assert menu_reads(ide) == 2
+    ide.IDE.MenuItems = 20
+    menu.GetIndex()
+    assert index.Fingerprint != fingerprint
+    assert len(index) == 22
+
+def test_actions_written_on_change(ide, actions_file):
+    menu = PyRAD.PRMainMenu()
+    index = menu.GetIndex(ActionsFile=actions_file)
+    assert index.find_action('action1_12').Path == 'Menu1|Item 1.12'
+    assert index.find_action('Action2_25') is not None
+    for _ in range(2): menu.GetIndex()
+    assert ide.Calls['IDE_MainMenu_WriteActionsToFile'] == 1
+    ide.IDE.MenuItems = 20
+    menu.GetIndex()
+    assert ide.Calls['IDE_MainMenu_WriteActionsToFile'] == 2
+    assert index.find_action('Action2_25') is None
+
+def test_validate_reuses_index(ide, actions_file):
+    menu = PyRAD.PRMainMenu()
+    menu.GetIndex(ActionsFile=actions_file)
+    for _ in range(3):
+        assert menu.ExecuteMenuItem('Menu1|Item 1.12', Validate=True)
+        assert menu.ExecuteAction('Action1_12', Validate=True)
+    assert menu_reads(ide) == 1
+    # a miss updates the tree only if it has not been checked recently
+    for _ in range(3):
+        with pytest.raises(PyRAD.EPRError):
+            menu.ExecuteMenuItem('Menu1|Missing', Validate=True)
+    assert menu_reads(ide) == 1
+    menu.ValidateMaxAge = 0
+    with pytest.raises(PyRAD.EPRError):
+        menu.ExecuteAction('Missing', Validate=True)
+    assert menu_reads(ide) == 2
+    assert ide.Calls['IDE_MainMenu_WriteActionsToFile'] == 1
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyrad_metrics_test
+# Purpose:     tests of the request statistics (PMetrics) and hooks of PReq
+#              against the fake DataSnap server (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyrad, json, pytest
+
+#-------------------------------------------------------------------------------
+
+def test_metrics(server, connect):
+    Req = connect(server, CacheSize=10)
+    for _ in range(3): Req.get_result('IDE_Packages_getCount')
+    Req.get_result('IDE_Packages_getCompCount', 99)
+    Req.get_results([('IDE_Packages_getCompCount', (i,)) for i in range(4)])
+    stats = Req.metrics_snapshot()
+    count = stats['IDE_Packages_getCount']
+    assert (count['calls'], count['cache_hits'], count['errors']) == (3, 2, 0)
+    assert count['histogram'][-1] == ['+Inf', 3]
+    assert 0 < count['time_min'] <= count['time_avg'] <= count['time_max']
+    assert (stats['IDE_Packages_getCompCount']['calls'], stats['IDE_Packages_getCompCount']['server_errors']) == (5, 1)
+    Req.metrics_reset()
+    assert Req.metrics_snapshot() == {}
+
+def test_metrics_errors(slow_server, connect):
+    Req = connect(slow_server, Timeout=0.1)
+    with pytest.raises(pyrad.ETimeoutError):
+        Req.get_result('IDE_Packages_getCount')
+    assert Req.metrics_snapshot()['IDE_Packages_getCount']['errors'] == 1
+
+def test_metrics_export(server, connect):
+    Req = connect(server)
+    Req.get_result('IDE_Packages_getCount')
+    assert json.loads(Req.metrics_export())['IDE_Packages_getCount']['calls'] == 1
+    text = Req.metrics_export('prometheus')
+    assert 'pyrad_calls_total{method="IDE_Packages_getCount"} 1\n' in text
+    assert 'pyrad_request_duration_seconds_bucket{method="IDE_Packages_getCount",le="+Inf"} 1\n' in text
+    assert '# TYPE pyrad_request_duration_seconds histogram\n' in text
+    with pytest.raises(pyrad.EGenericError):
+        Req.metrics_export('xml')
+
+def test_metrics_disabled(server, connect):
+    Req = connect(server, Metrics=False)
+    Req.get_result('IDE_Packages_getCount')
+    assert Req.metrics_snapshot() is None
+    with pytest.raises(pyrad.EGenericError):
+        Req.metrics_export()
+
+def test_percentile():
+    metrics = pyrad.PMetrics()
+    for i in range(1, 101): metrics.record('f', i / 100.0)
+    metrics.record('f', 10.0, error=True)
+    assert metrics.percentile('f', 50) == 0.51
+    assert metrics.percentile('f', 100) == 1.0
+    assert metrics.percentile('f', 50, MinSamples=200) is None
+
+def test_hooks(server, connect):
+    Req = connect(server)
+    events = []
+    def before(func_name, args, kwargs):
+        events.append(('before', func_name, args))
+        kwargs['timeout'] = 5
+    def after(func_name, args, result, elapsed):
+        events.append(('after', func_name, result))
+    Req.add_hook('before', before)
+    Req.add_hook('after', after)
+    assert Req.get_result('IDE_Packages_getCompCount', 1) == 5
+    assert events == [('before', 'IDE_Packages_getCompCount', (1,)), ('after', 'IDE_Packages_getCompCount', 5)]
+    Req.remove_hook('before', before)
+    Req.remove_hook('after', after)
+    Req.get_result('IDE_Packages_getCount')
+    assert len(events) == 2
+    with pytest.raises(pyrad.EGenericError):
+        Req.add_hook('during', before)
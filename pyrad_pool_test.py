@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyrad_pool_test
+# Purpose:     tests of the PReq keep-alive connection pool (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pytest
+
+#-------------------------------------------------------------------------------
+
+@pytest.mark.parametrize('transport', ['requests', 'httpclient'])
+def test_connections_reused(server, connect, transport):
+    Req = connect(server, Transport=transport)
+    for _ in range(20): Req.get_result('IDE_Packages_getCount')
+    stats = Req.pool_stats()
+    assert stats['requests'] == 20
+    assert stats['misses'] == 1
+    assert stats['hits'] == 19
+
+@pytest.mark.parametrize('transport', ['requests', 'httpclient'])
+def test_no_keepalive(server, connect, transport):
+    Req = connect(server, Transport=transport, KeepAlive=False)
+    for _ in range(5): Req.get_result('IDE_Packages_getCount')
+    assert Req.pool_stats()['misses'] == 5
+
+def test_close_keeps_client_usable(server, connect):
+    Req = connect(server)
+    Req.get_result('IDE_Packages_getCount')
+    Req.close()
+    assert Req.get_result('IDE_Packages_getCount') == 10
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyrad_retry_test
+# Purpose:     tests of the timeouts, deadlines, retries and hedged requests
+#              of PReq against the fake DataSnap server (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyrad, time, pytest
+
+#-------------------------------------------------------------------------------
+
+TRANSPORTS = ['requests', 'httpclient',
+              pytest.param('aiohttp', marks=pytest.mark.skipif(pyrad.sys.version_info[0] < 3, reason='Python 3 only'))]
+
+def patch_send(Req, delays):
+    """
+    Wrap the transport 'send' of the client: the n-th request is delayed by
+    delays[n] seconds, or fails with a connection error if it is None.
+    Returns the list of the numbers of the sent requests.
+    """
+    sent = []
+    send = Req.Transport.send
+    def patched(*args, **kwargs):
+        n = len(sent)
+        sent.append(n)
+        delay = delays[n] if n < len(delays) else 0
+        if delay is None: raise pyrad.requests.exceptions.ConnectionError('dropped')
+        time.sleep(delay)
+        return send(*args, **kwargs)
+    Req.Transport.send = patched
+    return sent
+
+#---- TIMEOUTS AND DEADLINES
+
+@pytest.mark.parametrize('transport', TRANSPORTS)
+def test_timeout(slow_server, connect, transport):
+    if transport == 'aiohttp': pytest.importorskip('aiohttp')
+    Req = connect(slow_server, Transport=transport, Timeout=0.1)
+    with pytest.raises(pyrad.ETimeoutError):
+        Req.get_result('IDE_Packages_getCount')
+
+def test_deadline(slow_server, connect):
+    Req = connect(slow_server)
+    with pytest.raises(pyrad.ETimeoutError):
+        Req.get_result('IDE_Packages_getCount', deadline=0.1)
+
+def test_operation_deadline(slow_server, connect):
+    Req = connect(slow_server, BatchWidth=2)
+    t0 = pyrad.timer()
+    with pyrad.Deadline(0.5):
+        assert Req.get_result('IDE_Packages_getCount') == 10
+        with pytest.raises(pyrad.ETimeoutError):
+            Req.get_result('IDE_Packages_getCount')
+    with pyrad.Deadline(0.1):
+        results = Req.get_results(['IDE_Packages_getCount'] * 2)
+    assert all(isinstance(res, pyrad.ETimeoutError) for res in results)
+    assert pyrad.timer() - t0 < 1.0
+    with pytest.raises(pyrad.EGenericError):
+        pyrad.Deadline()
+
+#---- RETRIES
+
+def test_retried_timeout(slow_server, connect):
+    Req = connect(slow_server, Timeout=0.1, Retries=2, RetryBackoff=0.01)
+    with pytest.raises(pyrad.ETimeoutError) as info:
+        Req.get_result('IDE_Packages_getCount')
+    assert isinstance(info.value, pyrad.ERetryError)
+    assert len(info.value.Errors) == 3
+
+def test_writes_not_retried(slow_server, connect):
+    Req = connect(slow_server, Timeout=0.1, Retries=2, RetryBackoff=0.01)
+    with pytest.raises(pyrad.ETimeoutError):
+        Req.get_result('IDE_Packages_ToggleLoaded', 0, True)
+    time.sleep(0.5)
+    assert slow_server.Calls['IDE_Packages_ToggleLoaded'] == 1
+
+def test_retry_recovers(server, connect):
+    Req = connect(server, Retries=2, RetryBackoff=0.01)
+    sent = patch_send(Req, [None])
+    assert Req.get_result('IDE_Packages_getCount') == 10
+    assert sent == [0, 1]
+
+#---- HEDGED REQUESTS
+
+def test_hedged_read(server, connect):
+    Req = connect(server, Hedge=0.05)
+    sent = patch_send(Req, [1.0])
+    t0 = pyrad.timer()
+    assert Req.get_result('IDE_Packages_getCount') == 10
+    assert pyrad.timer() - t0 < 0.5
+    assert sent == [0, 1]
+
+def test_writes_not_hedged(server, connect):
+    Req = connect(server, Hedge=0.05)
+    sent = patch_send(Req, [0.2])
+    assert Req.get_result('IDE_Packages_ToggleLoaded', 0, True) is True
+    assert sent == [0]
+
+def test_hedge_percentile(server, connect):
+    Req = connect(server, Hedge='p90')
+    for _ in range(pyrad.HEDGE_MINSAMPLES): Req.get_result('IDE_Packages_getCount')
+    sent = patch_send(Req, [1.0])
+    t0 = pyrad.timer()
+    assert Req.get_result('IDE_Packages_getCount') == 10
+    assert pyrad.timer() - t0 < 0.5
+    assert sent == [0, 1]
+
+def test_hedge_percentile_needs_samples(server, connect):
+    Req = connect(server, Hedge='p90')
+    sent = patch_send(Req, [0.3])
+    Req.get_result('IDE_Packages_getCount')
+    assert sent == [0]
+
+def test_wrong_hedge(server, connect):
+    with pytest.raises(pyrad.EGenericError):
+        connect(server, Hedge='fast').get_result('IDE_Packages_getCount')
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyrad_snapshot_test
+# Purpose:     tests of the package collection (PRPackages) with and without
+#              a snapshot against the fake DataSnap server (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyradclasses as PyRAD
+import pytest
+
+#-------------------------------------------------------------------------------
+
+def test_snapshot_iterates_repeatedly(ide):
+    packages = PyRAD.PRPackages(Snapshot=True)
+    names = [pk.Name for pk in packages]
+    assert names == ['dclpackage{0}_250.bpl'.format(i) for i in range(10)]
+    assert [pk.Name for pk in packages] == names
+    ncalls = ide.CallCount
+    list(packages)
+    assert packages[3].Name == names[3]
+    assert ide.CallCount == ncalls
+
+def test_iteration_reads_count_once(ide):
+    packages = PyRAD.PRPackages()
+    ncalls = ide.Calls.get('IDE_Packages_getPackagesValue', 0)
+    assert len([pk for pk in packages]) == 10
+    assert ide.Calls['IDE_Packages_getPackagesValue'] == ncalls + 1
+
+def test_snapshot_lookups(ide):
+    packages = PyRAD.PRPackages(Snapshot=True)
+    assert packages.GetPackage('DCLPACKAGE2_250.BPL').Index == 2
+    assert 'dclpackage5_250.bpl' in packages
+    assert 'missing.bpl' not in packages
+    with pytest.raises(PyRAD.EPRError):
+        packages.GetPackage(10)
+
+def test_snapshot_stale_after_install(ide):
+    packages = PyRAD.PRPackages(Snapshot=True)
+    assert packages.IsStale()
+    len(packages)
+    assert not packages.IsStale()
+    PyRAD.Req.get_result('IDE_Packages_Install', 'c:\\x\\new1.bpl')
+    assert packages.IsStale()
+    packages.Uninstall('new1.bpl')
+    assert len(packages) == 10
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyrad_startup_test
+# Purpose:     tests of the deferred and cached connection checks of PReq
+#              (LazyConnect, ConnectionCache) against the fake DataSnap server
+#              (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyrad, json, pytest
+
+#-------------------------------------------------------------------------------
+
+DOWN = {'Hostname': '127.0.0.1', 'Port': 1, 'URL': 'x'}
+
+def checks(Server):
+    return Server.Calls.get('CheckConnection', 0)
+
+def test_connect_checked_right_away(server):
+    pyrad.PReq('CheckConnection', server.DSConfig).close()
+    assert checks(server) == 1
+    with pytest.raises(pyrad.EGenericError):
+        pyrad.PReq('CheckConnection', DOWN)
+
+@pytest.mark.parametrize('lazy', [True, 'background'])
+def test_lazy_connect(server, lazy):
+    Req = pyrad.PReq('CheckConnection', dict(server.DSConfig, LazyConnect=lazy))
+    try:
+        assert Req.get_result('IDE_Packages_getCount') == 10
+        Req.get_result('IDE_Packages_getCount')
+        assert checks(server) == 1
+    finally:
+        Req.close()
+
+@pytest.mark.parametrize('lazy', [True, 'background'])
+def test_lazy_connect_error(lazy):
+    Req = pyrad.PReq('CheckConnection', dict(DOWN, LazyConnect=lazy))
+    # the failed check is repeated by the next call
+    for _ in range(2):
+        with pytest.raises(pyrad.EGenericError):
+            Req.get_result('IDE_Packages_getCount')
+
+def test_connection_cache(server, tmp_path):
+    cachefile = str(tmp_path / 'connections.json')
+    for _ in range(3):
+        pyrad.PReq('CheckConnection', dict(server.DSConfig, ConnectionCache=cachefile)).close()
+    assert checks(server) == 1
+    with open(cachefile) as ifile:
+        assert list(json.load(ifile)) == [pyrad.PReq('', server.DSConfig).Dserver]
+    pyrad.PReq('CheckConnection', dict(server.DSConfig, ConnectionCache=cachefile, ConnectionCacheTTL=0)).close()
+    assert checks(server) == 2
+
+def test_connection_cache_not_written_on_failure(tmp_path):
+    cachefile = tmp_path / 'connections.json'
+    with pytest.raises(pyrad.EGenericError):
+        pyrad.PReq('CheckConnection', dict(DOWN, ConnectionCache=str(cachefile)))
+    assert not cachefile.exists()
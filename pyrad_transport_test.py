@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyrad_transport_test
+# Purpose:     tests of the HTTP transports of PReq (see pyrad.TRANSPORTS)
+#              against the fake DataSnap server (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyrad, socket, threading, pytest
+from pyrad_fakeserver import FakeDSServer
+
+#-------------------------------------------------------------------------------
+
+TRANSPORTS = ['requests', 'httpclient',
+              pytest.param('aiohttp', marks=pytest.mark.skipif(pyrad.sys.version_info[0] < 3, reason='Python 3 only'))]
+
+@pytest.mark.parametrize('transport', TRANSPORTS)
+def test_transport_calls(server, connect, transport):
+    if transport == 'aiohttp': pytest.importorskip('aiohttp')
+    Req = connect(server, Transport=transport)
+    assert Req.get_result('IDE_Packages_getCount') == 10
+    assert Req.get_result('IDE_Packages_getPackageInfo', 3)['Name'] == 'dclpackage3_250.bpl'
+    assert Req.get_result('IDE_Packages_getPackageInfo', 99).startswith('ERROR: ')
+    names = Req.get_result('IDE_Packages_getPackagesValue', 'PackageNames')
+    assert list(Req.get_result('IDE_Packages_getPackagesValue', 'PackageNames', stream=True)) == names
+    assert Req.get_results([('IDE_Packages_getCompCount', (i,)) for i in range(10)]) == [5] * 10
+    Req.close()
+    assert Req.get_result('IDE_Packages_getCount') == 10
+
+@pytest.mark.parametrize('transport', TRANSPORTS)
+def test_transport_auth(connect, transport):
+    if transport == 'aiohttp': pytest.importorskip('aiohttp')
+    with FakeDSServer(Packages=10, Login='user', Password='secret') as Server:
+        assert connect(Server, Transport=transport).get_result('IDE_Packages_getCount') == 10
+        with pytest.raises(pyrad.EGenericError):
+            pyrad.PReq('CheckConnection', dict(Server.DSConfig, Password='wrong', Transport=transport))
+
+def test_unknown_transport(server, connect):
+    with pytest.raises(pyrad.EGenericError):
+        connect(server, Transport='nope')
+
+def test_transport_is_abstract(server, connect):
+    class PNoSendTransport(pyrad.PTransport):
+        Name = 'nosend'
+    with pytest.raises(TypeError):
+        PNoSendTransport(connect(server))
+
+def test_httpclient_resends_reads_only(server, connect):
+    # a listener that reads the request and drops the connection, as if
+    # the kept-alive connection had been closed after the request was sent
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(5)
+    def drop():
+        while True:
+            conn = listener.accept()[0]
+            conn.recv(65536)
+            conn.close()
+    thread = threading.Thread(target=drop)
+    thread.daemon = True
+    thread.start()
+    Req = connect(server, Transport='httpclient')
+    try:
+        Req.Transport._idle.append(socket.create_connection(listener.getsockname()))
+        assert Req.get_result('IDE_Packages_getCount') == 10
+        Req.Transport._idle.append(socket.create_connection(listener.getsockname()))
+        with pytest.raises(pyrad.EGenericError):
+            Req.get_result('IDE_Packages_ToggleLoaded', 0, True)
+        assert server.Calls.get('IDE_Packages_ToggleLoaded', 0) == 0
+    finally:
+        listener.close()
+
+def test_aiohttp_close(server, connect, monkeypatch):
+    pyradasync = pytest.importorskip('pyradasync')
+    registered = []
+    monkeypatch.setattr(pyradasync.atexit, 'register', registered.append)
+    Req = connect(server, Transport='aiohttp')
+    loops = []
+    for _ in range(3):
+        assert Req.get_result('IDE_Packages_getCount') == 10
+        loops.append(Req.Transport._loop)
+        assert Req.Transport in pyradasync._running
+        Req.close()
+    # each close stops and closes the loop, no exit handlers are added
+    assert all(loop.is_closed() for loop in loops)
+    assert not pyradasync._running
+    assert registered == []
+
+def test_describe_keeps_message():
+    with pytest.raises(pyrad.EGenericError) as info:
+        pyrad.PReq('CheckConnection', {'Hostname': '127.0.0.1', 'Port': 1, 'URL': 'x'})
+    assert '127.0.0.1' in str(info.value)
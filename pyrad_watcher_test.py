@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyrad_watcher_test
+# Purpose:     tests of the package snapshot refresh (PRPackages.Refresh) and
+#              the package watcher (PRPackagesWatcher) against the fake
+#              DataSnap server (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyradclasses as PyRAD
+import time
+
+#-------------------------------------------------------------------------------
+
+def calls(Server, func_name):
+    return Server.Calls.get(func_name, 0)
+
+def test_snapshot_refresh_delta(ide):
+    packages = PyRAD.PRPackages(Snapshot=True)
+    list(packages)
+    PyRAD.Req.get_result('IDE_Packages_Install', 'c:\\x\\new1.bpl')
+    PyRAD.Req.get_result('IDE_Packages_Uninstall', 'dclpackage4_250.bpl')
+    ninfos = calls(ide, 'IDE_Packages_getPackageInfo')
+    delta = packages.Refresh(CheckLoaded=False)
+    assert [pk.Name for pk in delta.Added] == ['new1.bpl']
+    assert [pk.Name for pk in delta.Removed] == ['dclpackage4_250.bpl']
+    # only the added package is retrieved
+    assert calls(ide, 'IDE_Packages_getPackageInfo') == ninfos + 1
+    assert len(packages) == 10
+
+def test_snapshot_refresh_without_changes(ide):
+    packages = PyRAD.PRPackages(Snapshot=True)
+    len(packages)
+    ncalls = ide.CallCount
+    assert not packages.Refresh(CheckLoaded=False)
+    assert ide.CallCount == ncalls + 1
+
+def test_snapshot_refresh_loaded(ide):
+    packages = PyRAD.PRPackages(Snapshot=True)
+    loaded = packages.GetPackage(2).Loaded
+    PyRAD.Req.get_result('IDE_Packages_ToggleLoaded', 2, not loaded)
+    delta = packages.Refresh()
+    assert [pk.Name for pk in delta.LoadedChanged] == ['dclpackage2_250.bpl']
+
+def test_watcher_events(ide):
+    events = []
+    watcher = PyRAD.PRPackagesWatcher()
+    for event in ('added', 'removed'):
+        watcher.on(event, lambda event, pk: events.append((event, pk.Name)))
+    assert watcher.poll() is None
+    PyRAD.Req.get_result('IDE_Packages_Install', 'c:\\x\\new1.bpl')
+    watcher.poll()
+    PyRAD.Req.get_result('IDE_Packages_Uninstall', 'new1.bpl')
+    watcher.poll()
+    assert events == [('added', 'new1.bpl'), ('removed', 'new1.bpl')]
+
+def test_watcher_handler_error(ide):
+    errors = []
+    watcher = PyRAD.PRPackagesWatcher(MinInterval=0.02, MaxInterval=0.05)
+    watcher.on('added', lambda event, pk: 1 / 0)
+    watcher.on('error', lambda event, err: errors.append(err))
+    with watcher:
+        PyRAD.Req.get_result('IDE_Packages_Install', 'c:\\x\\new1.bpl')
+        time.sleep(0.3)
+        assert watcher._thread.is_alive()
+        ncalls = calls(ide, 'IDE_Packages_getPackagesValue')
+        time.sleep(0.3)
+        assert calls(ide, 'IDE_Packages_getPackagesValue') > ncalls
+    assert isinstance(errors[0], ZeroDivisionError)
+
+def test_watcher_polls_cheaply(ide):
+    watcher = PyRAD.PRPackagesWatcher(CheckLoaded=3)
+    watcher.poll()
+    ncalls = ide.CallCount
+    for _ in range(3): watcher.poll()
+    # one request per poll, the Loaded states on every 3rd poll
+    assert ide.CallCount == ncalls + 3 + 10
+
+def test_snapshot_refresh_after_uninstall(ide):
+    packages = PyRAD.PRPackages(Snapshot=True)
+    pk = packages.GetPackage(4)
+    assert pk.Uninstall()
+    delta = packages.Refresh()
+    assert delta.Removed == [pk]
+    assert len(packages) == 9 and 'dclpackage4_250.bpl' not in packages
+    assert not packages.Refresh()
+
+def test_watcher_after_uninstall(ide):
+    events = []
+    watcher = PyRAD.PRPackagesWatcher()
+    watcher.on('removed', lambda event, pk: events.append(pk))
+    watcher.on('error', lambda event, err: events.append(err))
+    watcher.poll()
+    pk = watcher.Packages.GetPackage(4)
+    pk.Uninstall()
+    watcher.poll()
+    watcher.poll()
+    assert events == [pk]
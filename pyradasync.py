@@ -0,0 +1,455 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyradasync
+# Purpose:     asyncio counterparts of the PReq client and the hot package reads
+#              (requires Python 3.5+ and aiohttp)
+#
+# Author:      shafikovis
+#
+# Created:     18.10.2026
+# Copyright:   (c) shafikovis 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import asyncio, atexit, weakref
+import aiohttp
+import pyrad
+from pyradclasses import EPRError
+from os import path
+
+#-------------------------------------------------------------------------------
+
+DEFAULT_CONCURRENCY = 4         # default max number of simultaneous requests per server
+
+#-------------------------------------------------------------------------------
+
+# PAiohttpTransport objects with a running event loop thread, closed at exit
+_running = weakref.WeakSet()
+
+def _close_transports():
+    "Close the transports still running at interpreter exit (see PAiohttpTransport)"
+    for transport in list(_running): transport.close()
+
+atexit.register(_close_transports)
+
+#-------------------------------------------------------------------------------
+
+class AsyncPReq(pyrad.PReq):
+    """
+    Asynchronous (asyncio) counterpart of PReq.
+    Exposes the awaitable 'get_result' and 'get_result_bool' methods that
+    build the request URL and format the result exactly as PReq does.
+    The number of simultaneous requests to the server is limited by
+    a semaphore (the 'MaxConcurrency' DSConfig key).
+    Usage:
+        async with AsyncPReq('CheckConnection', DSConfig) as Req:
+            res = await Req.get_result('IDE_Packages_getCount')
+    """
+
+    # the aiohttp session replaces the requests session of PReq (see _get_session)
+    Session = None
+
+    def __init__(self, check_connection_method='', DSConfig=None):
+        """
+        <Constructor>
+        Assign the server settings (see PReq). The connection check
+        is performed on entering the 'async with' block or by 'connect'.
+        """
+        self._load_config(DSConfig)
+        self.CheckConnectionMethod = check_connection_method
+        self.PoolSize = int(self.DSConfig.get('PoolSize', pyrad.DEFAULT_POOLSIZE))
+        self.KeepAlive = bool(self.DSConfig.get('KeepAlive', True))
+        self.Timeout = self.DSConfig.get('Timeout', None)
+        self.MaxConcurrency = int(self.DSConfig.get('MaxConcurrency', DEFAULT_CONCURRENCY))
+        self.Cache = pyrad.PResultCache(self.DSConfig['CacheSize'], self.DSConfig.get('CacheTTL', None)) \
+            if self.DSConfig.get('CacheSize', 0) else None
+        self._init_metrics(self.DSConfig)
+        self.Flights = pyrad.PSingleFlight() if self.DSConfig.get('Coalesce', False) else None
+        self.Session = None
+        self._semaphore = None
+
+    def __del__(self):
+        """
+        <Destructor>
+        The aiohttp session can only be closed from a coroutine
+        (see 'close'), so nothing is done here.
+        """
+        pass
+
+    async def __aenter__(self):
+        """
+        <Async context manager protocol>
+        Check the connection on entering the 'async with' block.
+        """
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """
+        <Async context manager protocol>
+        Close the pooled connections on leaving the 'async with' block.
+        """
+        await self.close()
+        return False
+
+    #------------------ PUBLIC METHODS ----------------------#
+
+    async def connect(self):
+        """
+        Check the connection with the method passed to the constructor,
+        raise an error on failure.
+        """
+        if not await self.check_connection(self.CheckConnectionMethod):
+            raise pyrad.EGenericError('Failed to connect to the DataSnap server!')
+
+    async def check_connection(self, check_connection_method=''):
+        """
+        Awaitable version of PReq.check_connection.
+        """
+        return (await self.get_result_bool(check_connection_method)) \
+            if check_connection_method else True
+
+    async def close(self):
+        """
+        Close the aiohttp session with all the pooled connections.
+        """
+        if self.Session is not None:
+            await self.Session.close()
+            self.Session = None
+
+    def pool_stats(self):
+        """
+        Not supported by the aiohttp connector.
+        """
+        raise pyrad.EGenericError('Pool statistics are not available in AsyncPReq!')
+
+    async def get_result(self, func_name, *args, **kwargs):
+        """
+        Awaitable version of PReq.get_result (including the optional
+        response cache, request statistics and hooks). At most MaxConcurrency
+        requests are sent to the server at the same time, the others wait.
+        The 'deadline' keyword argument limits the time of the call in seconds
+        (including the wait); timeouts raise ETimeoutError. Concurrent identical
+        read calls are coalesced as in PReq. Retries, hedging and streaming
+        are not supported.
+        """
+        t0 = self._before_request(func_name, args, kwargs)
+        try:
+            Res, nbytes, cached, coalesced = await self._get_result(func_name, args, kwargs)
+        except pyrad.EGenericError as err:
+            self._after_request(func_name, args, t0, err)
+            raise
+        self._after_request(func_name, args, t0, Res, nbytes, cached, coalesced)
+        return Res
+
+    async def get_result_bool(self, func_name, *args, **kwargs):
+        """
+        Awaitable version of PReq.get_result_bool.
+        """
+        bRes = await self.get_result(func_name, *args, **kwargs)
+        return isinstance(bRes, bool) and bRes
+
+    async def get_results(self, calls, width=None):
+        """
+        Awaitable version of PReq.get_results: the calls are gathered
+        concurrently (at most 'width' at a time if given, in addition to
+        the MaxConcurrency limit). Results are returned in the order of 'calls',
+        failed calls return their exception object (EGenericError).
+        """
+        calls = [self._get_call(call) for call in calls]
+        limit = asyncio.Semaphore(int(width)) if width else None
+
+        async def get_result_safe(func_name, args, kwargs):
+            try:
+                if limit is None:
+                    return await self.get_result(func_name, *args, **kwargs)
+                async with limit:
+                    return await self.get_result(func_name, *args, **kwargs)
+            except pyrad.EGenericError as err:
+                return err
+
+        return list(await asyncio.gather(*[get_result_safe(*call) for call in calls]))
+
+    #------------------ PROTECTED METHODS ----------------------#
+
+    async def _get_result(self, func_name, args, kwargs):
+        """
+        Implementation of get_result: return a tuple (result, number of
+        received bytes, whether the result was taken from the cache,
+        whether it was shared by a concurrent identical call).
+        """
+        ckey = fkey = None
+        try:
+            # the control arguments are taken out before the call is keyed
+            quotemethod = kwargs.pop('quotemethod', True)
+            requesttype = kwargs.pop('requesttype', 'post').lower()
+            url = kwargs.pop('url', None)
+            deadline = kwargs.pop('deadline', None)
+            if requesttype not in ('post', 'get'):
+                raise pyrad.EGenericError('Wrong request type!')
+            if kwargs.pop('stream', False):
+                raise pyrad.EGenericError('Streaming (stream=True) is not supported by AsyncPReq!')
+            # only the calls made in the default form are cached and coalesced
+            # (see PReq.get_result)
+            keyed = quotemethod and (requesttype == 'post') and (url is None)
+            ckey = self.Cache.key(func_name, args, kwargs) if (self.Cache is not None) and keyed else None
+            if ckey is not None:
+                cached = self.Cache.get(ckey)
+                if cached is not None: return (self._parse_result(*cached), 0, True, False)
+                cgen = self.Cache.generation(ckey)
+            # share the response of an identical read in flight, or start a new flight
+            if self.Flights is not None:
+                self.Flights.invalidate(func_name)
+                fkey = self.Flights.key(func_name, args, kwargs) if keyed else None
+            if fkey is not None:
+                flight, leader = self.Flights.join(fkey, asyncio.get_event_loop().create_future)
+                if not leader:
+                    content, encoding = await asyncio.wait_for(asyncio.shield(flight), deadline)
+                    return (self._parse_result(content, encoding), 0, False, True)
+            # the leader of a flight resolves it whatever happens (see PReq.get_result)
+            try:
+                surl = url or self._make_url(func_name, quotemethod, *args)
+                session = self._get_session()
+                async def fetch():
+                    async with self._semaphore:
+                        async with session.request(requesttype, surl, **kwargs) as req:
+                            return await req.read(), req.charset
+                content, encoding = await asyncio.wait_for(fetch(), deadline)
+            except BaseException as err:
+                if fkey is not None:
+                    self.Flights.leave(fkey, flight)
+                    if isinstance(err, asyncio.CancelledError):
+                        flight.cancel()
+                    else:
+                        flight.set_exception(err)
+                        # the exception is raised here, whether the flight is awaited or not
+                        flight.exception()
+                raise
+            if fkey is not None:
+                self.Flights.leave(fkey, flight)
+                flight.set_result((content, encoding))
+
+        except pyrad.EGenericError:
+            # re-raise all EGenericError exceptions
+            raise
+
+        except asyncio.TimeoutError:
+            raise pyrad.ETimeoutError('{0} has timed out!'.format(func_name))
+
+        except aiohttp.ClientError as err:
+            # internal aiohttp exception
+            raise pyrad.EGenericError(pyrad._describe(err))
+
+        except Exception as err:
+            # some other exception
+            raise pyrad.EGenericError(err)
+
+        else:
+            Res = self._parse_result(content, encoding)
+            if (ckey is not None) and not (isinstance(Res, str) and Res.startswith('ERROR: ')):
+                self.Cache.put(ckey, (content, encoding), cgen)
+            return (Res, len(content), False, False)
+
+        finally:
+            if self.Cache is not None: self.Cache.invalidate(func_name)
+            if self.Flights is not None: self.Flights.invalidate(func_name)
+
+    def _get_session(self):
+        """
+        Create the aiohttp session and the concurrency semaphore on first use
+        (both must be created inside a running event loop).
+        """
+        if self.Session is None:
+            self._semaphore = asyncio.Semaphore(self.MaxConcurrency)
+            self.Session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.PoolSize,
+                                               force_close=not self.KeepAlive),
+                timeout=aiohttp.ClientTimeout(total=self.Timeout),
+                auth=aiohttp.BasicAuth(*self.Auth) if self.Auth else None,
+                headers={'Accept': 'application/json',
+                         'Content-Type': 'text/plain;charset=UTF-8'})
+        return self.Session
+
+#-------------------------------------------------------------------------------
+
+class PAiohttpTransport(pyrad.PTransport):
+    """
+    Transport of the synchronous PReq (DSConfig 'Transport' = 'aiohttp', see
+    pyrad.TRANSPORTS) sending the requests with an aiohttp session from an event
+    loop running in a background thread: the calling threads (e.g. the
+    get_results workers) share one asyncio connection pool. Streamed responses
+    are read whole before their items are decoded.
+    """
+    Name = 'aiohttp'
+    Errors = (aiohttp.ClientError, asyncio.TimeoutError)
+    RetryErrors = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+    TimeoutErrors = (asyncio.TimeoutError,)
+    CloseTimeout = 5.0
+
+    def __init__(self, Req):
+        pyrad.PTransport.__init__(self, Req)
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._lock = pyrad.threading.Lock()
+
+    def send(self, requesttype, url, timeout=None, stream=False, **kwargs):
+        if isinstance(timeout, tuple): timeout = max(t for t in timeout if t is not None) \
+                                                 if any(t is not None for t in timeout) else None
+        future = asyncio.run_coroutine_threadsafe(self.__fetch(requesttype, url, timeout, kwargs), self.__start())
+        content, status, headers, encoding = future.result()
+        response = pyrad.PResponse(status, headers, content)
+        if encoding: response.encoding = encoding
+        return response
+
+    def close(self):
+        """
+        Close the session, stop the event loop thread and close the loop
+        (a new loop is started by the next request).
+        """
+        with self._lock:
+            loop, session, thread = self._loop, self._session, self._thread
+            self._loop = self._session = self._thread = None
+        if loop is None: return
+        _running.discard(self)
+        # the loop thread may be already gone at interpreter exit
+        if thread.is_alive() and loop.is_running():
+            if session is not None:
+                try:
+                    asyncio.run_coroutine_threadsafe(session.close(), loop).result(self.CloseTimeout)
+                except Exception:
+                    pass
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(self.CloseTimeout)
+        if not thread.is_alive(): loop.close()
+
+    def __start(self):
+        "Start the event loop thread and create the session on first use"
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = pyrad.threading.Thread(target=loop.run_forever)
+                self._thread.daemon = True
+                self._thread.start()
+                _running.add(self)
+                async def create():
+                    return aiohttp.ClientSession(
+                        connector=aiohttp.TCPConnector(limit=self.PoolSize, force_close=not self.KeepAlive),
+                        auth=aiohttp.BasicAuth(*self.Auth) if self.Auth else None,
+                        headers={'Accept': 'application/json', 'Content-Type': 'text/plain;charset=UTF-8'})
+                self._session = asyncio.run_coroutine_threadsafe(create(), loop).result()
+                self._loop = loop
+            return self._loop
+
+    async def __fetch(self, requesttype, url, timeout, kwargs):
+        async with self._session.request(requesttype, url, timeout=aiohttp.ClientTimeout(total=timeout),
+                                         **kwargs) as req:
+            return await req.read(), req.status, dict(req.headers), req.charset
+
+#-------------------------------------------------------------------------------
+
+#---- PACKAGE
+
+class AsyncPRPackage(object):
+    """
+    Asynchronous counterpart of pyradclasses.PRPackage.
+    Objects are created by 'await AsyncPRPackage.create(Req, index)'
+    (or by AsyncPRPackages.GetPackage), after which the package info
+    properties (Name, FileName, Loaded...) are available as attributes.
+    Network reads are exposed as coroutine methods.
+    """
+    def __init__(self, Req, index=-1):
+        """
+        <Constructor>
+        Bind the object to an AsyncPReq client. No requests are made here.
+        """
+        self._Req = Req
+        self.Index = index
+        self._pkinfo = {}
+
+    @classmethod
+    async def create(cls, Req, index):
+        """
+        Create a package object from its index or file name and load its info.
+        """
+        pk = cls(Req)
+        await pk.Reload(index)
+        return pk
+
+    async def Reload(self, index=None):
+        """
+        Retrieve the package info by index or package file name
+        (or by the current Name if 'index' is None).
+        """
+        if index is None:
+            index = self.Name
+        if isinstance(index, str):
+            pknames = await self._Req.get_result('IDE_Packages_getPackagesValue', 'PackageNames')
+            pkname = path.basename(index).lower()
+            for i, pk in enumerate(pknames):
+                if pkname == pk.lower():
+                    index = i
+                    break
+            else:
+                raise EPRError('Cannot find package "{0}"!'.format(index))
+        self.Index = index
+        self._pkinfo = await self._Req.get_result('IDE_Packages_getPackageInfo', self.Index)
+        if not isinstance(self._pkinfo, dict):
+            raise EPRError('Wrong package index {0}!'.format(index))
+        self.__dict__.update(self._pkinfo)
+        return True
+
+    async def ComponentCount(self):
+        return (await self._Req.get_result('IDE_Packages_getCompCount', self.Index)) \
+               if self.Index >= 0 else 0
+
+    async def Components(self):
+        """
+        Retrieve the component names concurrently.
+        """
+        if self.Index < 0: return []
+        count = await self.ComponentCount()
+        return list(await asyncio.gather(
+            *[self._Req.get_result('IDE_Packages_getCompName', self.Index, i)
+              for i in range(count)]))
+
+    async def IsInstalled(self):
+        pknames = await self._Req.get_result('IDE_Packages_getPackagesValue', 'PackageNames')
+        return (self.Name in pknames)
+
+    def __str__(self):
+        return pyrad.tostr('\n'.join('{k}: {v}'.format(k=k, v=v)
+                                     for k, v in sorted(self._pkinfo.items())))
+
+#---- PACKAGES (COLLECTION)
+
+class AsyncPRPackages(object):
+    """
+    Asynchronous counterpart of pyradclasses.PRPackages (read operations).
+    Use 'await GetPackages()' to load all the packages concurrently.
+    """
+    def __init__(self, Req):
+        self._Req = Req
+
+    async def PackageNames(self):
+        return await self._Req.get_result('IDE_Packages_getPackagesValue', 'PackageNames')
+
+    async def Count(self):
+        return len(await self.PackageNames())
+
+    async def GetPackage(self, index):
+        return await AsyncPRPackage.create(self._Req, index)
+
+    async def GetPackages(self, indices=None):
+        """
+        Load the packages with the given indices (or all the packages
+        if 'indices' is None) concurrently, preserving the order.
+        """
+        if indices is None:
+            indices = range(await self.Count())
+        return list(await asyncio.gather(*[self.GetPackage(i) for i in indices]))
+
+    async def IsInstalled(self, index):
+        return path.basename(index) in (await self.PackageNames())
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyradasync_test
+# Purpose:     tests of the asyncio client (AsyncPReq) and the async package
+#              reads against the fake DataSnap server (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyrad, asyncio, pytest
+pyradasync = pytest.importorskip('pyradasync')
+
+#-------------------------------------------------------------------------------
+
+def run(Server, coro, **DSConfig):
+    "Run coro(Req) with a connected AsyncPReq client and return its result"
+    async def main():
+        async with pyradasync.AsyncPReq('CheckConnection', dict(Server.DSConfig, **DSConfig)) as Req:
+            return await coro(Req)
+    return asyncio.run(main())
+
+def test_get_result(server):
+    async def calls(Req):
+        return (await Req.get_result('IDE_Packages_getCount'),
+                await Req.get_result('IDE_Packages_getPackageInfo', 3),
+                await Req.get_result_bool('IDE_Packages_ToggleLoaded', 0, True))
+    count, pkinfo, toggled = run(server, calls)
+    assert (count, pkinfo['Name'], toggled) == (10, 'dclpackage3_250.bpl', True)
+
+def test_get_results_order(server):
+    async def calls(Req):
+        return await Req.get_results([('IDE_Packages_getPackageInfoValue', (i, 'Name')) for i in range(10)],
+                                     width=3)
+    assert run(server, calls) == ['dclpackage{0}_250.bpl'.format(i) for i in range(10)]
+
+def test_concurrency_limit(slow_server):
+    async def calls(Req):
+        return await Req.get_results(['IDE_Packages_getCount'] * 4)
+    t0 = pyrad.timer()
+    assert run(slow_server, calls, MaxConcurrency=2, Coalesce=False) == [10] * 4
+    assert pyrad.timer() - t0 >= 0.6
+
+def test_cache_with_deadline(server):
+    async def calls(Req):
+        for _ in range(2): await Req.get_result('IDE_Packages_getCount', deadline=5)
+    run(server, calls, CacheSize=10)
+    assert server.Calls['IDE_Packages_getCount'] == 1
+
+def test_deadline(slow_server):
+    async def calls(Req):
+        return await Req.get_result('IDE_Packages_getCount', deadline=0.1)
+    with pytest.raises(pyrad.ETimeoutError):
+        run(slow_server, calls)
+
+def test_stream_rejected(server):
+    async def calls(Req):
+        return await Req.get_result('IDE_Packages_getCount', stream=True)
+    with pytest.raises(pyrad.EGenericError) as info:
+        run(server, calls)
+    assert 'stream' in str(info.value)
+
+def test_connection_error():
+    async def main():
+        async with pyradasync.AsyncPReq('CheckConnection', {'Hostname': '127.0.0.1', 'Port': 1, 'URL': 'x'}):
+            pass
+    with pytest.raises(pyrad.EGenericError) as info:
+        asyncio.run(main())
+    assert '127.0.0.1' in str(info.value)
+
+def test_packages(server):
+    async def calls(Req):
+        Packages = pyradasync.AsyncPRPackages(Req)
+        pks = await Packages.GetPackages()
+        return await Packages.Count(), [pk.Name for pk in pks]
+    count, names = run(server, calls)
+    assert count == 10
+    assert names == ['dclpackage{0}_250.bpl'.format(i) for i in range(10)]
@@ -11,26 +11,72 @@
 #-------------------------------------------------------------------------------
 
 from __future__ import print_function
-import pyrad, sys
+import pyrad, os, sys, time, hashlib, threading, weakref
+from pyrad import basestring, xrange
 from os import path
 from numbers import Real
-from inspect import ismethod
+from types import MethodType
+from collections import OrderedDict, deque
 
 #-------------------------------------------------------------------------------
 
 Req = None
+_context = threading.local()
 
 def Reload(DSConfig=None):
     """
     Global function that MUST be called before creating and accessing any
-    PyRAD classes below. It creates a single PReq object (used for client/server
+    PyRAD classes below (unless they are given a client explicitly, see Connect
+    and Use). It creates a single PReq object (used for client/server
     data transfer) and assigned it to the global Req variable (which is
     preassigned with None). This variable is then shared by any PyRAD classes
-    to make specific requests and get back results.
+    to make specific requests and get back results. Returns the created object.
+    For short-lived scripts, pass 'LazyConnect' and/or 'ConnectionCache' in DSConfig
+    to defer the connection check or skip it if it has been made recently
+    (see PReq.__init_connect).
     """
     #reload(pyrad)
     global Req
     Req = pyrad.PReq('CheckConnection', DSConfig)
+    return Req
+
+def Connect(DSConfig=None):
+    """
+    Create a new client (PReq object) for the server given by DSConfig
+    without changing the global Req. The client can be passed to the PyRAD
+    classes in their 'Req' argument or made the default one with Use.
+    """
+    return pyrad.PReq('CheckConnection', DSConfig)
+
+def Current():
+    """
+    Return the client used by default by the PyRAD objects created in
+    the current thread: the one set by Use, or the global Req.
+    """
+    Client = getattr(_context, 'Req', None)
+    return Client if Client is not None else Req
+
+class Use(object):
+    """
+    Context manager that makes a client (PReq object) the default one
+    for the PyRAD objects created in the current thread inside the 'with' block.
+    Other threads are not affected, so each thread can work with its own server:
+        with Use(Connect(DSConfig)):
+            pk = PRPackage(0)
+    The objects keep using the client they were created with after leaving the block.
+    """
+    def __init__(self, Client):
+        self.Req = Client
+        self._previous = []
+
+    def __enter__(self):
+        self._previous.append(getattr(_context, 'Req', None))
+        _context.Req = self.Req
+        return self.Req
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _context.Req = self._previous.pop()
+        return False
 
 #-------------------------------------------------------------------------------
 
@@ -45,14 +91,17 @@ class PRObject(object):
     Base class for all PyRAD classes below.
     Defines some common functionality, such as string representation.
     """
-    def __init__(self):
+    __slots__ = ()
+
+    def __init__(self, Req=None):
         """
-        Before constructed, we check that the global Req variable is assigned.
-        We assume that to do that, the global Reload function MUST be called
-        before ever accesing any PyRAD classes. If Req is unassigned (=None),
-        an exception is raised.
+        Bind the object to the client (PReq object) passed in 'Req',
+        or to the default one (see Current): the client set by Use
+        in the current thread, or the global Req variable assigned by Reload.
+        If there is no client, an exception is raised.
         """
-        if Req is None:
+        self._Req = Req if Req is not None else Current()
+        if self._Req is None:
             raise EPRError('Request object is not instantiated!\n'
                            'Call Reload before accessing any PRObject classes.')
 
@@ -64,9 +113,9 @@ class PRObject(object):
         """
         if args:
             targs = args + ('ErrorMsg',)
-            return Req.get_result(func, *targs)
+            return self._Req.get_result(func, *targs)
         else:
-            return Req.get_result(func, 'ErrorMsg')
+            return self._Req.get_result(func, 'ErrorMsg')
 
     def __str__(self):
         """
@@ -78,10 +127,137 @@ class PRObject(object):
         pairs = []
         for attr in dir(self):
             val = getattr(self, attr)
-            if (attr[:1] != '_') and (not ismethod(val)):
+            if (attr[:1] != '_') and (not isinstance(val, MethodType)):
                 pairs.append('{k}: {v}'.format(k=attr, v=val))
         return pyrad.tostr('\n'.join(pairs))
 
+#---- PACKAGE INDEX
+
+class PRPackageIndex(object):
+    """
+    Hash index of the IDE packages: maps lower-cased package names
+    (e.g. 'rtl170.bpl') and full file names to package indices, so that
+    lookups by name take O(1) time. The index is only rebuilt when the
+    package set (list of names) changes.
+    """
+    def __init__(self):
+        self._pknames = None
+        self._names = {}
+        self._filenames = {}
+
+    def update(self, pknames, pkinfos=None):
+        """
+        Rebuild the index from the list of package names and
+        (optionally) the list of package infos (to index the FileName values),
+        if the package set has changed since the last update.
+        """
+        if (pknames == self._pknames) and ((pkinfos is None) or self._filenames): return
+        names, filenames = {}, {}
+        for i, pk in enumerate(pknames):
+            names.setdefault(pk.lower(), i)
+        for i, pkinfo in enumerate(pkinfos or ()):
+            if isinstance(pkinfo, dict) and pkinfo.get('FileName'):
+                filenames.setdefault(pkinfo['FileName'].lower(), i)
+        self._pknames, self._names, self._filenames = list(pknames), names, filenames
+
+    def find(self, pkname):
+        """
+        Return the index of the package given by its name or full file name,
+        or -1 if not found.
+        """
+        pkname = pkname.lower()
+        index = self._filenames.get(pkname, None)
+        return index if index is not None else self._names.get(pkname.replace('\\', '/').rsplit('/', 1)[-1], -1)
+
+_pkindices = weakref.WeakKeyDictionary()
+_pkindices_lock = threading.Lock()
+
+def _findpackage(Req, pkname):
+    """
+    Return the index of the IDE package given by its name or file name
+    (or -1 if not found), making one request for the package names.
+    Each client (Req) has its own package index.
+    """
+    pknames = Req.get_result('IDE_Packages_getPackagesValue', 'PackageNames')
+    with _pkindices_lock:
+        PkIndex = _pkindices.get(Req)
+        if PkIndex is None: PkIndex = _pkindices[Req] = PRPackageIndex()
+        PkIndex.update(pknames)
+        return PkIndex.find(pkname)
+
+#---- PACKAGE COMPONENTS
+
+class PRComponents(object):
+    """
+    Lazy sequence of the component names of a package (see PRPackage.Components).
+    Supports len(), indexing, slicing and iteration. The component count is
+    retrieved on first need, and the names are retrieved concurrently in chunks
+    of ChunkSize (see PReq.get_results) only when the corresponding items
+    are accessed. Retrieved names are kept in the object.
+    """
+    ChunkSize = 32
+
+    def __init__(self, index, Req):
+        self.Index = index
+        self._Req = Req
+        self._count = None
+        self._names = []
+        self._chunks = set()
+
+    def __len__(self):
+        if self._count is None:
+            count = self._Req.get_result('IDE_Packages_getCompCount', self.Index) \
+                    if self.Index >= 0 else 0
+            if not isinstance(count, int) or isinstance(count, bool):
+                raise EPRError('Error loading component count for package index {0}!\n'
+                               'Returned result = {1}'.format(self.Index, count))
+            self._count, self._names = count, [None] * count
+        return self._count
+
+    def __getitem__(self, index):
+        """
+        <Indexing protocol: OBJECT[INDEX] or OBJECT[START:STOP:STEP]>
+        Return a component name (or a list of names for a slice).
+        """
+        if isinstance(index, slice):
+            indices = xrange(*index.indices(len(self)))
+            self.__load(indices)
+            return [self._names[i] for i in indices]
+        count = len(self)
+        if index < 0: index += count
+        if (index < 0) or (index >= count):
+            raise IndexError('Wrong component index {0}!'.format(index))
+        self.__load((index,))
+        return self._names[index]
+
+    def __iter__(self):
+        """
+        <Iteration protocol>
+        Yield the component names (retrieving them chunk by chunk).
+        """
+        for i in xrange(len(self)):
+            yield self[i]
+
+    def __str__(self):
+        return pyrad.tostr(list(self))
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __load(self, indices):
+        """
+        Retrieve the names in all the chunks containing 'indices'
+        that have not been retrieved yet.
+        """
+        chunks = sorted(set(i // self.ChunkSize for i in indices) - self._chunks)
+        if not chunks: return
+        calls = [('IDE_Packages_getCompName', (self.Index, i)) for chunk in chunks \
+                 for i in xrange(chunk * self.ChunkSize, min((chunk + 1) * self.ChunkSize, self._count))]
+        for call, res in zip(calls, self._Req.get_results(calls)):
+            if isinstance(res, Exception): raise res
+            self._names[call[1][1]] = res
+        self._chunks.update(chunks)
+
 #---- PACKAGE
 
 class PRPackage(PRObject):
@@ -105,7 +281,7 @@ class PRPackage(PRObject):
         * ImplicitList:     (list) list of implicitly required packages
         * RequiredByList:   (list) list of packages that require this package
         * ComponentCount:   (int) number of components installed with this package
-        * Components:       (list) list of contained components
+        * Components:       (PRComponents) lazy list of contained components
     ------------------------------------------------------------
     NB!
     * These properties are ONLY available after a successfull execution of the
@@ -117,15 +293,22 @@ class PRPackage(PRObject):
     of them after calling __clear will raise runtime exceptions. Call Reload or
     Install to restore these properties (with updated values).
     """
-    def __init__(self, index):
+    def __init__(self, index, pkinfo=None, Req=None):
         """
         <Constructor>
         Check the 'index' arg passed into it and retrieve
         the package info from the IDE for the corresponding package.
         If 'index' is wrong (not a number between 0 and package count and
         not a valid package filename), an EPRError exception is thrown.
+        If the package info (dictionary) is already known, it can be passed
+        in 'pkinfo' together with the numeric index, so no requests are made.
+        The client to use is passed in 'Req' (see PRObject).
         """
-        PRObject.__init__(self)
+        PRObject.__init__(self, Req)
+
+        if isinstance(pkinfo, dict) and isinstance(index, Real):
+            self._setinfo(index, pkinfo)
+            return
 
         if isinstance(index, Real):
             if self.__check_index(index):
@@ -136,14 +319,12 @@ class PRPackage(PRObject):
                 raise EPRError('Wrong package index {0}!'.format(index))
 
         elif isinstance(index, basestring):
-            pknames = Req.get_result('IDE_Packages_getPackagesValue', 'PackageNames')
-            for i, pk in enumerate(pknames):
-                if path.basename(index).lower()==pk.lower():
-                    self.Index = i
-                    self.__getpkinfo()
-                    return
-            else:
+            i = _findpackage(self._Req, index)
+            if i < 0:
                 raise EPRError('Cannot find package "{0}"!'.format(index))
+            self.Index = i
+            self.__getpkinfo()
+            return
 
         raise EPRError('Wrong index type passed to PRPackage constructor ({0})!'.format(type(index)))
 
@@ -163,34 +344,38 @@ class PRPackage(PRObject):
             self.__getpkinfo()
             return True
         else:
-            pknames = Req.get_result('IDE_Packages_getPackagesValue', 'PackageNames')
-            for i, pkname in enumerate(pknames):
-                if self.Name == pkname:
-                    self.Index = i
-                    self.__getpkinfo()
-                    return True
-            else:
-                self.__clear()
+            i = _findpackage(self._Req, self.Name)
+            if i >= 0:
+                self.Index = i
+                self.__getpkinfo()
+                return True
+            self.__clear()
             return False
 
     @property
     def ComponentCount(self):
-        return Req.get_result('IDE_Packages_getCompCount', self.Index) \
-               if self.Index >= 0 else 0
+        return len(self.Components)
 
     @property
     def Components(self):
-        return [Req.get_result('IDE_Packages_getCompName', self.Index, i) \
-                for i in xrange(self.ComponentCount)] \
-                if self.Index >= 0 else []
+        """
+        Return the component names as a lazy sequence (see PRComponents),
+        which is kept until the package is reloaded, (un)installed or
+        its Loaded state is toggled.
+        """
+        components = getattr(self, '_components', None)
+        if (components is None) or (components.Index != self.Index):
+            components = self._components = PRComponents(self.Index, self._Req)
+        return components
 
     def SetLoaded(self, bLoaded=True):
         """
         Toggle the Loaded state of the package, updating the value
         of self.Loaded on success.
         """
-        res = Req.get_result('IDE_Packages_ToggleLoaded', self.Index, bLoaded)
+        res = self._Req.get_result('IDE_Packages_ToggleLoaded', self.Index, bLoaded)
         if res: self.Loaded = bLoaded
+        self._components = None
         return res
 
     def Install(self):
@@ -205,7 +390,7 @@ class PRPackage(PRObject):
             FName = self._pkinfo['FileName']
         else:
             raise EPRError('Package filename is not assigned!\nCreate new object or reload from index.')
-        res = Req.get_result('IDE_Packages_Install', FName)
+        res = self._Req.get_result('IDE_Packages_Install', FName)
         return self.Reload()
 
     def Uninstall(self):
@@ -213,7 +398,7 @@ class PRPackage(PRObject):
         Try to uninstall this package from the IDE. If the operation succeeds,
         all the internal properties are cleared.
         """
-        res = Req.get_result('IDE_Packages_Uninstall', self.FileName)
+        res = self._Req.get_result('IDE_Packages_Uninstall', self.FileName)
         if res: self.__clear()
         return res
 
@@ -222,15 +407,24 @@ class PRPackage(PRObject):
         Check if this package is currently installed in the IDE by searching
         the package name among the IDE packages.
         """
-        pknames = Req.get_result('IDE_Packages_getPackagesValue', 'PackageNames')
-        return (self.Name in pknames)
+        return (_findpackage(self._Req, self.Name) >= 0)
+
+    def _setinfo(self, index, pkinfo):
+        """
+        Assign the package index and the already retrieved package info
+        (used by PRPackages to update its snapshot without requests).
+        """
+        self.Index = index
+        self._pkinfo = pkinfo
+        self.__dict__.update(pkinfo)
+        self._components = None
 
     def __check_index(self, index):
         """
         Validate the numeric index passed as 'index' (must be >= 0 and < package count).
         """
         if index < 0: return False
-        return (index < Req.get_result('IDE_Packages_getCount'))
+        return (index < self._Req.get_result('IDE_Packages_getCount'))
 
     def __getpkinfo(self):
         """
@@ -239,8 +433,9 @@ class PRPackage(PRObject):
         class properties (_pkinfo is not cleared by the __clear method).
         The ComponentCount and Components properties are added / updated separately.
         """
-        self._pkinfo = Req.get_result('IDE_Packages_getPackageInfo', self.Index)
+        self._pkinfo = self._Req.get_result('IDE_Packages_getPackageInfo', self.Index)
         self.__dict__.update(self._pkinfo)
+        self._components = None
 
     def __clear(self):
         """
@@ -252,6 +447,218 @@ class PRPackage(PRObject):
             for key in self._pkinfo:
                 if (key in self.__dict__) and (key != '_pkinfo'): del self.__dict__[key]
         self.Index = -1
+        self._components = None
+
+#---- PACKAGE INFO RECORD
+
+try:
+    _sysintern = sys.intern
+except AttributeError:
+    # Python 2.x (interns byte strings only)
+    _sysintern = intern
+
+def _intern(value):
+    """
+    Return the interned copy of a string (or a list of strings), so that
+    names and paths repeated across many packages are stored once.
+    Unicode strings are returned as they are in Python 2.
+    """
+    if isinstance(value, str):
+        return _sysintern(value)
+    if isinstance(value, list):
+        return [_intern(item) for item in value]
+    return value
+
+class PRPackageInfo(object):
+    """
+    Compact fixed-layout record of the package info returned by
+    IDE_Packages_getPackageInfo (see PRPackage for the field descriptions).
+    String values are interned (see _intern). Any fields not listed in
+    __slots__ are kept in the _extra dictionary.
+    """
+    __slots__ = ('FileName', 'Name', 'Description', 'Producer', 'Consumer',
+                 'SymbolFileName', 'RuntimeOnly', 'DesigntimeOnly', 'IDEPackage',
+                 'Loaded', 'ContainsList', 'RequiresList', 'ImplicitList',
+                 'RequiredByList', '_extra')
+
+    def __init__(self, pkinfo):
+        for key in self.__slots__[:-1]:
+            setattr(self, key, _intern(pkinfo.get(key, None)))
+        extra = dict((key, _intern(val)) for key, val in pkinfo.items() if key not in self.__slots__)
+        self._extra = extra or None
+
+    def asdict(self):
+        """
+        Return the info as a dictionary (in the IDE_Packages_getPackageInfo format).
+        """
+        pkinfo = dict((key, getattr(self, key)) for key in self.__slots__[:-1])
+        if self._extra: pkinfo.update(self._extra)
+        return pkinfo
+
+    def __repr__(self):
+        return repr(self.asdict())
+
+#---- PACKAGE HANDLE
+
+class PRPackageHandle(PRObject):
+    """
+    Lightweight counterpart of PRPackage: creating a handle makes no requests.
+    The package info is retrieved (with a single request) on first access to
+    any of its properties, except Name if it has been passed to the constructor.
+    The info is stored in a compact PRPackageInfo record, and the handle itself
+    has a fixed (slot-based) layout, so that thousands of handles can be held
+    in memory at little cost. All the PRPackage properties are available
+    under the same names.
+    """
+    __slots__ = ('Index', '_name', '_info', '_components', '_Req')
+
+    def __init__(self, index, Name=None, Req=None):
+        """
+        <Constructor>
+        Create a handle for the package with the given index
+        (and optionally the known package name), bound to the client 'Req' (see PRObject).
+        """
+        PRObject.__init__(self, Req)
+        self.Index = index
+        self._name = _intern(Name)
+        self._info = None
+        self._components = None
+
+    @property
+    def Info(self):
+        """
+        Return the package info record (PRPackageInfo), retrieving it on first access.
+        """
+        if self._info is None: self.Reload(self.Index)
+        return self._info
+
+    @property
+    def Name(self):
+        return self._name if self._name is not None else self.Info.Name
+
+    @property
+    def LastError(self):
+        return PRObject._getlasterror(self, 'IDE_Packages_getPackageInfoValue', self.Index)
+
+    def Reload(self, index=None):
+        """
+        Retrieve the package info by index (or, if 'index' is None, find the
+        package by Name first). If the package at the index turns out to have
+        another name than the one known to the handle, the package is looked up
+        by name. Returns False if the package is not found.
+        """
+        lookup = index is None
+        if lookup:
+            index = _findpackage(self._Req, self.Name)
+            if index < 0:
+                self.Index, self._info, self._components = -1, None, None
+                return False
+        pkinfo = self._Req.get_result('IDE_Packages_getPackageInfo', index) if index >= 0 else None
+        if not isinstance(pkinfo, dict):
+            raise EPRError('Wrong package index {0}!'.format(index))
+        if (self._name is not None) and (_pkkey(pkinfo.get('Name', None) or '') != _pkkey(self._name)):
+            # the package collection has changed since the handle was created
+            if lookup:
+                raise EPRError('Package "{0}" found at index {1} has another name: "{2}"!'.format(
+                               self._name, index, pkinfo.get('Name', None)))
+            self.Index = -1
+            return self.Reload()
+        self.Index, self._info, self._components = index, PRPackageInfo(pkinfo), None
+        self._name = self._info.Name
+        return True
+
+    @property
+    def ComponentCount(self):
+        return len(self.Components)
+
+    @property
+    def Components(self):
+        """
+        Same as PRPackage.Components.
+        """
+        if (self._components is None) or (self._components.Index != self.Index):
+            self._components = PRComponents(self.Index, self._Req)
+        return self._components
+
+    def SetLoaded(self, bLoaded=True):
+        res = self._Req.get_result('IDE_Packages_ToggleLoaded', self.Index, bLoaded)
+        if res and (self._info is not None): self._info.Loaded = bLoaded
+        self._components = None
+        return res
+
+    def Install(self):
+        self._Req.get_result('IDE_Packages_Install', self.FileName)
+        return self.Reload()
+
+    def Uninstall(self):
+        res = self._Req.get_result('IDE_Packages_Uninstall', self.FileName)
+        if res: self.Index, self._components = -1, None
+        return res
+
+    def IsInstalled(self):
+        return (_findpackage(self._Req, self.Name) >= 0)
+
+def _infoproperty(key):
+    "Return a property reading the given field of PRPackageHandle.Info"
+    return property(lambda self: getattr(self.Info, key))
+
+for _key in PRPackageInfo.__slots__[:-1]:
+    if _key != 'Name': setattr(PRPackageHandle, _key, _infoproperty(_key))
+
+#---- BULK PACKAGE OPERATIONS
+
+class PRPackageResult(object):
+    """
+    Outcome of an operation on a single package in a bulk operation
+    (see PRPackages.InstallMany, UninstallMany and SetLoadedMany).
+    ------------------------------------------------------------
+    Available properties:
+        * Name:     (string) package (file) name as passed to the bulk operation
+        * Result:   result returned by the server (None on failure)
+        * Error:    exception raised by the operation (None on success), e.g.
+                    EPRError if the package has not been found or has been
+                    skipped because a package it depends on has failed
+        * Wave:     (int) number of the wave the operation has run in (from 0)
+        * Time:     (float) operation time in seconds
+        * Ok:       (bool) whether the operation has succeeded
+    """
+    __slots__ = ('Name', 'Result', 'Error', 'Wave', 'Time')
+
+    def __init__(self, Name, Result=None, Error=None, Wave=0, Time=0.0):
+        self.Name = Name
+        self.Result = Result
+        self.Error = Error
+        self.Wave = Wave
+        self.Time = Time
+
+    @property
+    def Ok(self):
+        return (self.Error is None) and (self.Result is not False)
+
+    def __repr__(self):
+        return 'PRPackageResult({0!r}, {1}, wave {2}, {3:.3f} s)'.format(self.Name,
+            'ERROR: {0}'.format(self.Error) if self.Error is not None else
+            '{0}: {1!r}'.format('OK' if self.Ok else 'FAILED', self.Result), self.Wave, self.Time)
+
+def _pkkey(pkname):
+    "Package key for the dependency lists: lower-cased base name without the extension"
+    name = pkname.replace('\\', '/').rsplit('/', 1)[-1].lower()
+    return name[:-4] if name.endswith(('.bpl', '.dcp')) else name
+
+def _waves(items, deps):
+    """
+    Split the items into topological waves: each item comes after all the
+    items it depends on (deps: item -> set of items), and the items of a wave
+    do not depend on each other. Items in a dependency cycle make the last wave.
+    """
+    waves, done, left = [], set(), list(items)
+    while left:
+        wave = [item for item in left if deps.get(item, set()) <= done]
+        if not wave: wave = left
+        waves.append(wave)
+        done.update(wave)
+        left = [item for item in left if item not in done]
+    return waves
 
 #---- PACKAGES (COLLECTION)
 
@@ -259,9 +666,23 @@ class PRPackage(PRObject):
 class PRPackages(PRObject):
     """
     Class representing the IDE collection of packages.
+    ------------------------------------------------------------
+    If created with Snapshot=True, the package names and infos are retrieved
+    once (the infos - concurrently, see PReq.get_results) and kept in memory.
+    Iteration, indexing, len() and name lookups then work with this snapshot
+    and make no requests. The snapshot is taken on first access and can be
+    updated by calling Refresh (use IsStale to check if it is out of date).
+    Install and Uninstall mark the snapshot as out of date, so it is refreshed
+    on next access (only the changed packages are retrieved, see Refresh).
+    PRPackagesWatcher polls the snapshot and raises events on changes.
     """
-    def __init__(self):
-        PRObject.__init__(self)
+    def __init__(self, Snapshot=False, Req=None):
+        PRObject.__init__(self, Req)
+        self.Snapshot = Snapshot
+        self.SnapshotTime = None
+        self._pknames = None
+        self._packages = None
+        self._index = PRPackageIndex()
         self.Reload()
 
     @property
@@ -271,12 +692,100 @@ class PRPackages(PRObject):
     def Reload(self):
         self._pkindex = -1
 
+    def Refresh(self, Full=False, CheckLoaded=True):
+        """
+        Take a new snapshot of the IDE packages and return the changes since
+        the previous one (PRPackagesDelta). The package names are retrieved first.
+        The first snapshot (or any snapshot if Full is True) then retrieves the infos
+        of all the packages in one concurrent batch. The next ones only retrieve
+        the infos of the added packages and of the packages whose order relative
+        to the other packages has changed; the other packages keep their infos
+        (and PRPackage objects), and only their Loaded state is re-checked
+        (in one concurrent batch, if CheckLoaded is True).
+        Cached package responses (see PReq) are dropped before the refresh.
+        """
+        self._Req.cache_clear(['packages'])
+        pknames = self._Req.get_result('IDE_Packages_getPackagesValue', 'PackageNames')
+        if not isinstance(pknames, list):
+            raise EPRError('Error loading package names!\nReturned result = {0}'.format(pknames))
+        # the packages of the previous snapshot are keyed by the names in their infos,
+        # since an uninstalled package (see PRPackage.Uninstall) has its properties cleared
+        previous = self._packages if (self._packages is not None) and not Full else []
+        old = {}
+        for pk in previous:
+            if pk.Index >= 0: old.setdefault(pk._pkinfo['Name'].lower(), pk)
+        delta = PRPackagesDelta()
+        # packages kept from the previous snapshot, in the old and in the new order
+        keys = [pkname.lower() for pkname in pknames]
+        kept_new = [key for key in keys if key in old]
+        kept = set(kept_new)
+        kept_old = [key for key in (pk._pkinfo['Name'].lower() for pk in previous if pk.Index >= 0) if key in kept]
+        moved = set(key for key, oldkey in zip(kept_new, kept_old) if key != oldkey)
+        # retrieve the infos of the added and moved packages
+        fetch = [i for i, key in enumerate(keys) if (key not in old) or (key in moved)]
+        pkinfos = self._Req.get_results([('IDE_Packages_getPackageInfo', (i,)) for i in fetch])
+        for i, pkinfo in zip(fetch, pkinfos):
+            if not isinstance(pkinfo, dict):
+                raise EPRError('Error loading package info for index {0}!\n'
+                               'Returned result = {1}'.format(i, pkinfo))
+        fetched = dict(zip(fetch, pkinfos))
+        # re-check the Loaded state of the other packages
+        check = [i for i, key in enumerate(keys) if (i not in fetched) and CheckLoaded]
+        loaded = dict(zip(check, self._Req.get_results(
+            [('IDE_Packages_getPackageInfoValue', (i, 'Loaded')) for i in check])))
+        packages = []
+        for i, key in enumerate(keys):
+            pk = old.get(key)
+            if i in fetched:
+                if pk is None:
+                    pk = PRPackage(i, fetched[i], self._Req)
+                    delta.Added.append(pk)
+                else:
+                    wasloaded = pk.Loaded
+                    pk._setinfo(i, fetched[i])
+                    delta.Moved.append(pk)
+                    if pk.Loaded != wasloaded: delta.LoadedChanged.append(pk)
+            else:
+                pk.Index = i
+                if isinstance(loaded.get(i), bool) and (loaded[i] != pk.Loaded):
+                    pk.Loaded = pk._pkinfo['Loaded'] = loaded[i]
+                    pk._components = None
+                    delta.LoadedChanged.append(pk)
+            packages.append(pk)
+        current = set(id(pk) for pk in packages)
+        delta.Removed = [pk for pk in previous if id(pk) not in current]
+        self._index.update(pknames, [pk._pkinfo for pk in packages])
+        self._pknames, self._packages = pknames, packages
+        self.SnapshotTime = time.time()
+        return delta
+
+    def IsStale(self, MaxAge=None):
+        """
+        Check if the snapshot is out of date, i.e. it has not been taken yet,
+        it is older than MaxAge seconds (if given), or the IDE package names
+        have changed since it was taken (one request).
+        """
+        if self._pknames is None: return True
+        if (MaxAge is not None) and (time.time() - self.SnapshotTime > MaxAge): return True
+        return self._Req.get_result('IDE_Packages_getPackagesValue', 'PackageNames') != self._pknames
+
     @property
     def PackageNames(self):
         """
         Get package names as a list.
         """
-        return Req.get_result('IDE_Packages_getPackagesValue', 'PackageNames')
+        if self.Snapshot:
+            if self._pknames is None: self.Refresh()
+            return self._pknames
+        return self._Req.get_result('IDE_Packages_getPackagesValue', 'PackageNames')
+
+    def IterPackageNames(self):
+        """
+        Generator yielding the package names as they arrive from the server
+        (the response is streamed, see PReq.get_result), or from the snapshot.
+        """
+        if self.Snapshot: return iter(self.PackageNames)
+        return self._Req.get_result('IDE_Packages_getPackagesValue', 'PackageNames', stream=True)
 
     @property
     def Count(self):
@@ -285,30 +794,120 @@ class PRPackages(PRObject):
         """
         return len(self.PackageNames)
 
+    def GetHandle(self, index):
+        """
+        Return a lightweight package handle (see PRPackageHandle) given a package
+        index or name. The package info is retrieved on first access.
+        """
+        if isinstance(index, basestring):
+            i = self._getpkindex(index)
+            if i < 0: raise EPRError('Cannot find package "{0}"!'.format(index))
+            return PRPackageHandle(i, self.PackageNames[i], self._Req)
+        return PRPackageHandle(index, Req=self._Req)
+
+    def GetHandles(self):
+        """
+        Return handles (see PRPackageHandle) for all the packages, with their
+        names assigned (one request for the package names, or none in snapshot mode).
+        """
+        return [PRPackageHandle(i, pkname, self._Req) for i, pkname in enumerate(self.PackageNames)]
+
     def GetPackage(self, index):
-        return PRPackage(index)
+        if self.Snapshot:
+            if self._pknames is None: self.Refresh()
+            if isinstance(index, basestring):
+                i = self._getpkindex(index)
+                if i < 0: raise EPRError('Cannot find package "{0}"!'.format(index))
+                return self._packages[i]
+            if (index < 0) or (index >= len(self._packages)):
+                raise EPRError('Wrong package index {0}!'.format(index))
+            return self._packages[index]
+        return PRPackage(index, Req=self._Req)
 
     def Install(self, index):
-        res = Req.get_result('IDE_Packages_Install', \
+        res = self._Req.get_result('IDE_Packages_Install', \
             index if isinstance(index, basestring) else self._getpkname(index))
+        self._pknames = None
         self.Reload()
         return res
 
     def Uninstall(self, index):
-        res = Req.get_result('IDE_Packages_Uninstall', \
+        res = self._Req.get_result('IDE_Packages_Uninstall', \
             index if isinstance(index, basestring) else self._getpkname(index))
+        self._pknames = None
         self.Reload()
         return res
 
     def IsInstalled(self, index):
-        return ((path.basename(index) if isinstance(index, basestring) \
-            else self._getpkname(index, False)) in self.PackageNames)
+        return (self._getpkindex(index if isinstance(index, basestring) \
+            else self._getpkname(index, False)) >= 0)
+
+    def InstallMany(self, fnames, Requires=None, Width=None):
+        """
+        Install several packages given by their full file names, concurrently
+        in topological waves: a package is installed after the packages it requires.
+        Since the IDE knows nothing of the packages before they are installed,
+        their dependencies are taken from the optional 'Requires' dictionary:
+        package (file) name -> list of names of the required packages
+        (as in RequiresList, e.g. ['rtl', 'mypackage']); without it all the
+        packages are installed in one wave. At most 'Width' operations
+        (by default, the 'BatchWidth' DSConfig value) run at the same time.
+        Returns an ordered dictionary: file name -> PRPackageResult.
+        """
+        fnames = list(fnames)
+        requires = dict((_pkkey(name), reqs) for name, reqs in (Requires or {}).items())
+        batch = dict((_pkkey(fname), fname) for fname in fnames)
+        deps = dict((fname, set(batch[_pkkey(req)] for req in requires.get(_pkkey(fname), ())
+                                if _pkkey(req) in batch) - set([fname])) for fname in fnames)
+        try:
+            return self.__run_waves(fnames, deps, dict((fname, (fname,)) for fname in fnames),
+                                    'IDE_Packages_Install', Width)
+        finally:
+            self._pknames = None
+            self.Reload()
+
+    def UninstallMany(self, pknames, Width=None):
+        """
+        Uninstall several packages given by their names or file names,
+        concurrently in topological waves planned from their RequiresList and
+        RequiredByList: a package is uninstalled after the packages (of those
+        passed) that require it. A package is skipped if a package requiring it
+        has failed to uninstall. Returns an ordered dictionary:
+        package name (as passed) -> PRPackageResult (see InstallMany).
+        """
+        pknames, infos, results = self.__plan(pknames)
+        deps = self.__dependencies(infos, True)
+        try:
+            return self.__run_waves(pknames, deps, dict((pkname, (info[1]['FileName'],))
+                                    for pkname, info in infos.items()), 'IDE_Packages_Uninstall', Width, results)
+        finally:
+            self._pknames = None
+            self.Reload()
+
+    def SetLoadedMany(self, pknames, bLoaded=True, Width=None):
+        """
+        Toggle the Loaded state of several packages given by their names or file
+        names, concurrently in topological waves planned from their RequiresList
+        and RequiredByList: packages are loaded after the packages they require
+        and unloaded after the packages that require them. Returns an ordered
+        dictionary: package name (as passed) -> PRPackageResult (see InstallMany).
+        """
+        pknames, infos, results = self.__plan(pknames)
+        deps = self.__dependencies(infos, not bLoaded)
+        results = self.__run_waves(pknames, deps, dict((pkname, (info[0], bLoaded))
+                                   for pkname, info in infos.items()), 'IDE_Packages_ToggleLoaded', Width, results)
+        for pkname, res in results.items():
+            if res.Ok and (self._packages is not None) and (self._pknames is not None):
+                pk = self._packages[infos[pkname][0]]
+                pk.Loaded = pk._pkinfo['Loaded'] = bLoaded
+        self._Req.cache_clear(['packages'])
+        return results
 
     def _getpkindex(self, pkname):
-        for i, pk in enumerate(self.PackageNames):
-            if path.basename(pkname).lower()==pk.lower():
-                return i
-        return -1
+        if self.Snapshot:
+            if self._pknames is None: self.Refresh()
+            return self._index.find(pkname)
+        return _findpackage(self._Req, pkname)
 
     def _getpkname(self, index, FullPath=True):
         if (index < 0) or (index >= self.Count):
@@ -316,17 +915,112 @@ class PRPackages(PRObject):
         pk = self.GetPackage(index)
         return pk.FileName if FullPath else pk.Name
 
+    def __plan(self, pknames):
+        """
+        Find the packages for a bulk operation: returns the list of names,
+        a dictionary: name -> (index, package info) of the found packages,
+        and the failed results (PRPackageResult) of the packages not found.
+        The infos are taken from the snapshot or retrieved concurrently
+        (one request for the package names and one per package).
+        """
+        pknames = list(pknames)
+        if self.Snapshot:
+            indices = [self._getpkindex(pkname) for pkname in pknames]
+            pkinfos = [self._packages[i]._pkinfo if i >= 0 else None for i in indices]
+        else:
+            index = PRPackageIndex()
+            index.update(self._Req.get_result('IDE_Packages_getPackagesValue', 'PackageNames'))
+            indices = [index.find(pkname) for pkname in pknames]
+            pkinfos = iter(self._Req.get_results([('IDE_Packages_getPackageInfo', (i,)) for i in indices if i >= 0]))
+            pkinfos = [next(pkinfos) if i >= 0 else None for i in indices]
+        infos, results = OrderedDict(), {}
+        for pkname, i, pkinfo in zip(pknames, indices, pkinfos):
+            if i < 0:
+                results[pkname] = PRPackageResult(pkname, Error=EPRError('Cannot find package "{0}"!'.format(pkname)))
+            elif not isinstance(pkinfo, dict):
+                results[pkname] = PRPackageResult(pkname, Error=pkinfo if isinstance(pkinfo, Exception) else
+                    EPRError('Error loading package info for index {0}!\nReturned result = {1}'.format(i, pkinfo)))
+            else:
+                infos[pkname] = (i, pkinfo)
+        return pknames, infos, results
+
+    @staticmethod
+    def __dependencies(infos, Reverse):
+        """
+        Dependencies between the packages of a bulk operation, from their
+        RequiresList and RequiredByList: package name -> set of package names
+        to process first (the required packages, or the requiring ones if Reverse is True).
+        """
+        keys = {}
+        for pkname, (i, pkinfo) in infos.items():
+            keys[_pkkey(pkinfo.get('Name', pkname))] = pkname
+            if pkinfo.get('SymbolFileName'): keys.setdefault(pkinfo['SymbolFileName'].lower(), pkname)
+        deps = dict((pkname, set()) for pkname in infos)
+        for pkname, (i, pkinfo) in infos.items():
+            for req in pkinfo.get('RequiresList') or ():
+                other = keys.get(_pkkey(req))
+                if other not in (None, pkname):
+                    if Reverse: deps[other].add(pkname)
+                    else: deps[pkname].add(other)
+            for req in pkinfo.get('RequiredByList') or ():
+                other = keys.get(_pkkey(req))
+                if other not in (None, pkname):
+                    if Reverse: deps[pkname].add(other)
+                    else: deps[other].add(pkname)
+        return deps
+
+    def __run_waves(self, pknames, deps, args, func_name, Width=None, results=None):
+        """
+        Run func_name(*args[pkname]) for the packages in topological waves
+        (see _waves), the operations of a wave running concurrently,
+        and return an ordered dictionary: package name -> PRPackageResult.
+        The packages already in 'results' (failed ones) are not run.
+        """
+        results = dict(results or {})
+        width = self._Req.BatchWidth if Width is None else int(Width)
+        waves = _waves([pkname for pkname in pknames if pkname not in results], deps)
+        pool = pyrad.ThreadPool(min(width, max(len(wave) for wave in waves))) \
+               if waves and (width > 1) and (max(len(wave) for wave in waves) > 1) else None
+
+        def run(item):
+            pkname, wave = item
+            t0 = pyrad.timer()
+            try:
+                Res = self._Req.get_result(func_name, *args[pkname])
+            except pyrad.EGenericError as err:
+                return PRPackageResult(pkname, None, err, wave, pyrad.timer() - t0)
+            return PRPackageResult(pkname, Res, None, wave, pyrad.timer() - t0)
+
+        try:
+            for n, wave in enumerate(waves):
+                items = []
+                for pkname in wave:
+                    failed = [dep for dep in deps.get(pkname, ()) if (dep in results) and not results[dep].Ok]
+                    if failed:
+                        results[pkname] = PRPackageResult(pkname, Error=EPRError(
+                            'Skipped, since the operation has failed for {0}!'.format(failed)), Wave=n)
+                    else:
+                        items.append((pkname, n))
+                for res in (pool.map(run, items) if (pool is not None) and (len(items) > 1) else map(run, items)):
+                    results[res.Name] = res
+        finally:
+            if pool is not None: pool.terminate()
+        return OrderedDict((pkname, results[pkname]) for pkname in pknames)
+
     def __iter__(self):
         """
         <Iteration protocol>
-        Return this object as an iterator.
+        Return a new iterator over the packages, so the collection
+        (e.g. a snapshot) can be iterated any number of times.
+        The number of packages is read once, when the iteration starts.
         """
-        return self
+        for index in xrange(self.Count):
+            yield self.GetPackage(index)
 
     def next(self):
         """
-        <Iteration protocol>
-        Return a next package in the collection.
+        Return a next package in the collection (the position is kept
+        in the object and reset by Reload).
         """
         if self._pkindex >= (self.Count - 1):
             raise StopIteration
@@ -351,11 +1045,17 @@ class PRPackages(PRObject):
         """
         <Containment check>
         Used in expressions like (if item in collection...).
+        The item may be a package name / file name, a package index,
+        or a PRPackage object.
         """
-        try:
-            return bool(self.GetPackage(pk))
-        except:
-            return False
+        if isinstance(pk, PRPackage):
+            pk = getattr(pk, 'Name', None)
+            if pk is None: return False
+        if isinstance(pk, basestring):
+            return (self._getpkindex(pk) >= 0)
+        if isinstance(pk, Real):
+            return (0 <= pk < self.Count)
+        return False
 
     def __len__(self):
         """
@@ -373,8 +1073,469 @@ class PRPackages(PRObject):
         return pyrad.tostr(self.PackageNames)
 
 
+#---- PACKAGE CHANGES
+
+class PRPackagesDelta(object):
+    """
+    Changes of the IDE packages between two snapshots (see PRPackages.Refresh).
+    ------------------------------------------------------------
+    Available properties (lists of PRPackage objects):
+        * Added:            installed packages
+        * Removed:          uninstalled packages (objects from the previous snapshot)
+        * Moved:            packages whose order relative to the others has changed
+        * LoadedChanged:    packages whose Loaded state has changed
+    """
+    def __init__(self):
+        self.Added = []
+        self.Removed = []
+        self.Moved = []
+        self.LoadedChanged = []
+
+    def __bool__(self):
+        "True if there are any changes"
+        return bool(self.Added or self.Removed or self.Moved or self.LoadedChanged)
+
+    __nonzero__ = __bool__
+
+    def __str__(self):
+        return pyrad.tostr('\n'.join('{0}: {1}'.format(k, [pk.Name for pk in getattr(self, k)])
+                                     for k in ('Added', 'Removed', 'Moved', 'LoadedChanged')))
+
+class PRPackagesWatcher(object):
+    """
+    Watches the IDE packages in a background thread and raises events
+    when they change. The packages are polled with PRPackages.Refresh
+    (see PRPackagesDelta) at an adaptive interval: MinInterval seconds after
+    a change, growing by the Backoff factor with every poll that finds
+    no changes, up to MaxInterval seconds.
+    Events and the arguments of their handlers (see 'on'):
+        * 'added':      handler(event, package) for each installed package
+        * 'removed':    handler(event, package) for each uninstalled package
+        * 'loaded':     handler(event, package) for each package whose Loaded
+                        state has changed (see package.Loaded)
+        * 'changed':    handler(event, delta) once per poll with changes
+        * 'error':      handler(event, exception) if a poll or another
+                        handler has failed (after a failed poll, the next one
+                        is made after MaxInterval)
+    Handlers are called from the watcher thread. The Loaded states of the known
+    packages take one request per package to check, so by default they are only
+    re-checked on every CheckLoaded-th poll (True = every poll, False = never);
+    the other polls make a single request unless the package list has changed.
+    Usage:
+        Watcher = PRPackagesWatcher()
+        Watcher.on('added', lambda event, pk: print('Installed', pk.Name))
+        Watcher.start()
+    """
+    EVENTS = ('added', 'removed', 'loaded', 'changed', 'error')
+
+    def __init__(self, MinInterval=0.5, MaxInterval=10.0, Backoff=1.5, CheckLoaded=10, Req=None):
+        """
+        <Constructor>
+        Create the package snapshot bound to the client 'Req' (see PRObject).
+        The first snapshot is taken by 'start' (or the first 'poll')
+        and raises no events.
+        """
+        self.Packages = PRPackages(Snapshot=True, Req=Req)
+        self.MinInterval = MinInterval
+        self.MaxInterval = MaxInterval
+        self.Backoff = Backoff
+        self.CheckLoaded = CheckLoaded
+        self.Interval = MinInterval
+        self._polls = 0
+        self._handlers = dict((event, []) for event in self.EVENTS)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def on(self, event, handler):
+        """
+        Register an event handler (see the class description).
+        """
+        if event not in self._handlers:
+            raise EPRError('Wrong watcher event "{0}"!'.format(event))
+        self._handlers[event].append(handler)
+
+    def poll(self):
+        """
+        Refresh the package snapshot, raise the events and adapt the polling
+        interval. Returns the changes (PRPackagesDelta) or None for the first snapshot.
+        """
+        first = self.Packages.SnapshotTime is None
+        self._polls += 1
+        try:
+            delta = self.Packages.Refresh(CheckLoaded=bool(self.CheckLoaded) and
+                                          (self._polls % int(self.CheckLoaded) == 0))
+        except Exception as err:
+            self.Interval = self.MaxInterval
+            self.__raise('error', err)
+            return None
+        if first: return None
+        if delta:
+            self.Interval = self.MinInterval
+            for event, pks in (('added', delta.Added), ('removed', delta.Removed),
+                               ('loaded', delta.LoadedChanged)):
+                for pk in pks: self.__raise(event, pk)
+            self.__raise('changed', delta)
+        else:
+            self.Interval = min(self.Interval * self.Backoff, self.MaxInterval)
+        return delta
+
+    def start(self):
+        """
+        Take the first snapshot and start polling in a background thread.
+        """
+        if (self._thread is not None) and self._thread.is_alive(): return
+        self.poll()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.__run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop polling (waits for the current poll to complete).
+        """
+        if self._thread is None: return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def __run(self):
+        while not self._stop.wait(self.Interval):
+            try:
+                self.poll()
+            except Exception as err:
+                self.Interval = self.MaxInterval
+                self.__raise('error', err)
+
+    def __raise(self, event, arg):
+        "Call the event handlers; a failed handler raises the 'error' event"
+        for handler in list(self._handlers[event]):
+            try:
+                handler(event, arg)
+            except Exception as err:
+                if event != 'error': self.__raise('error', err)
+
+#---- PACKAGE DEPENDENCY GRAPH
+
+class PRPackageGraph(object):
+    """
+    Dependency graph of the IDE packages, built once from the package infos
+    (RequiresList and RequiredByList, and ImplicitList if Implicit is True)
+    and queried in memory. Each package has an integer node ID, and the edges
+    are kept in adjacency lists indexed by the IDs. Packages are looked up by
+    their names, file names or symbol file names (case-insensitive), e.g.
+    'rtl', 'rtl290.bpl' or 'c:\\...\\rtl290.bpl'. Packages that are only referenced
+    (e.g. runtime packages in RequiresList) get nodes too, with Installed = False.
+    Usage:
+        Graph = PRPackageGraph()
+        print(Graph.RequiredBy('rtl'))          # what breaks if rtl is uninstalled
+        print(Graph.LoadOrder(['mypackage']))   # what to load, requirements first
+    The graph is updated incrementally by 'add', 'remove' and 'update'
+    (which applies the changes returned by PRPackages.Refresh), or by 'sync'.
+    It can also be built offline from stored infos (see 'from_infos' and
+    pyradinventory.PRInventory.GetPackageInfos).
+    """
+    def __init__(self, Packages=None, Implicit=False, Req=None):
+        """
+        <Constructor>
+        Build the graph from a package snapshot (PRPackages object, by default
+        a new one created with Snapshot=True and bound to the client 'Req').
+        """
+        self.Implicit = Implicit
+        self.Packages = Packages if Packages is not None else PRPackages(Snapshot=True, Req=Req)
+        self.__clear()
+        for i in xrange(len(self.Packages)): self.add(self.Packages.GetPackage(i)._pkinfo)
+
+    @classmethod
+    def from_infos(cls, pkinfos, Implicit=False):
+        "Build the graph from a list of package infos (without the server)"
+        graph = cls.__new__(cls)
+        graph.Implicit = Implicit
+        graph.Packages = None
+        graph.__clear()
+        for pkinfo in pkinfos: graph.add(pkinfo)
+        return graph
+
+    def __len__(self):
+        "Number of installed packages"
+        return sum(1 for node in self._infos if node is not None)
+
+    def __contains__(self, pkname):
+        return self.id(pkname) >= 0
+
+    def id(self, pkname):
+        "Node ID of a package (by its name, file name or symbol file name), or -1 if not found"
+        return self._ids.get(_pkkey(pkname), -1)
+
+    def name(self, node):
+        "Package name of a node ID"
+        return self.Names[node]
+
+    def info(self, pkname):
+        "Package info of an installed package (None if not installed)"
+        return self._infos[self.__node(pkname)]
+
+    def IsInstalled(self, pkname):
+        node = self.id(pkname)
+        return (node >= 0) and (self._infos[node] is not None)
+
+    #------------------ QUERIES ----------------------#
+
+    def Requires(self, pkname, Transitive=True):
+        """
+        Names of the packages required by a package (directly, or also
+        indirectly if Transitive is True), nearest first.
+        """
+        return [self.Names[node] for node in self.__walk(self.__node(pkname), self._requires, Transitive)]
+
+    def RequiredBy(self, pkname, Transitive=True):
+        """
+        Names of the packages requiring a package (directly, or also indirectly
+        if Transitive is True), nearest first, i.e. the packages that break
+        if it is uninstalled.
+        """
+        return [self.Names[node] for node in self.__walk(self.__node(pkname), self._requiredby, Transitive)]
+
+    def Cycles(self):
+        """
+        Dependency cycles: a list of lists of package names (strongly connected
+        components of more than one package; packages requiring themselves are ignored).
+        """
+        return [[self.Names[node] for node in reversed(scc)] for scc in self.__sccs() if len(scc) > 1]
+
+    def HasCycle(self, pkname=None):
+        "Check if there is any dependency cycle (involving the given package, if passed)"
+        cycles = self.Cycles()
+        if pkname is None: return bool(cycles)
+        node = self.__node(pkname)
+        return any(node in [self.id(name) for name in cycle] for cycle in cycles)
+
+    def LoadOrder(self, pknames=None, Waves=False):
+        """
+        Order in which the given packages (all installed packages by default)
+        and the packages they require (transitively) can be loaded:
+        each package comes after the packages it requires. Packages in a cycle
+        come together, after the packages the cycle requires. Returns a list of
+        package names, or a list of waves (lists of package names not depending
+        on each other, see PRPackages.SetLoadedMany) if Waves is True.
+        """
+        if pknames is None:
+            nodes = [node for node, pkinfo in enumerate(self._infos) if pkinfo is not None]
+        else:
+            nodes = set()
+            for pkname in pknames:
+                node = self.__node(pkname)
+                nodes.add(node)
+                nodes.update(self.__walk(node, self._requires, True))
+            nodes = sorted(nodes)
+        included = set(nodes)
+        deps = dict((node, set(self._requires[node]) & included) for node in nodes)
+        waves = _waves(nodes, deps)
+        if Waves: return [[self.Names[node] for node in wave] for wave in waves]
+        return [self.Names[node] for wave in waves for node in wave]
+
+    #------------------ UPDATES ----------------------#
+
+    def add(self, pkinfo):
+        """
+        Add an installed package given its info (or update it if it is already
+        in the graph) and return its node ID.
+        """
+        aliases = self.__aliases(pkinfo)
+        node = next((self._ids[key] for key in aliases if key in self._ids), None)
+        if node is None:
+            node = self.__newnode(pkinfo.get('Name') or aliases[0])
+        elif self._infos[node] is not None:
+            self.__unlink(node)
+        self.Names[node] = pkinfo.get('Name') or self.Names[node]
+        for key in aliases: self._ids[key] = node
+        self._infos[node] = pkinfo
+        requires = list(pkinfo.get('RequiresList') or ())
+        if self.Implicit: requires += list(pkinfo.get('ImplicitList') or ())
+        for req in requires:
+            self.__link(node, self.__getnode(req), node)
+        for req in pkinfo.get('RequiredByList') or ():
+            self.__link(self.__getnode(req), node, node)
+        return node
+
+    def remove(self, pkname):
+        """
+        Remove an installed package: the edges declared by its info are dropped,
+        and its node is kept as not installed (the edges declared by the other
+        packages still point to it). Returns False if the package has not been installed.
+        """
+        node = self.id(pkname)
+        if (node < 0) or (self._infos[node] is None): return False
+        self.__unlink(node)
+        self._infos[node] = None
+        return True
+
+    def update(self, delta):
+        """
+        Apply the changes of the packages (PRPackagesDelta returned by PRPackages.Refresh).
+        """
+        for pk in delta.Removed: self.remove(pk.Name)
+        for pk in list(delta.Added) + list(delta.Moved): self.add(pk._pkinfo)
+
+    def sync(self, CheckLoaded=False):
+        """
+        Refresh the package snapshot the graph has been built from (see PRPackages.Refresh)
+        and apply the changes. Returns the changes (PRPackagesDelta).
+        """
+        if self.Packages is None:
+            raise EPRError('The package graph is not bound to a package snapshot!')
+        delta = self.Packages.Refresh(CheckLoaded=CheckLoaded)
+        self.update(delta)
+        return delta
+
+    #------------------ PRIVATE METHODS ----------------------#
+
+    def __clear(self):
+        self.Names = []                     # node ID -> package name
+        self._ids = {}                      # package key (see _pkkey) -> node ID
+        self._infos = []                    # node ID -> package info (None if not installed)
+        self._requires = []                 # node ID -> IDs of the required packages
+        self._requiredby = []               # node ID -> IDs of the requiring packages
+        self._sources = {}                  # (from, to) edge -> set of IDs of the packages declaring it
+
+    def __node(self, pkname):
+        node = self.id(pkname)
+        if node < 0: raise EPRError('Cannot find package "{0}"!'.format(pkname))
+        return node
+
+    def __newnode(self, name):
+        self.Names.append(name)
+        self._infos.append(None)
+        self._requires.append([])
+        self._requiredby.append([])
+        return len(self.Names) - 1
+
+    def __getnode(self, pkname):
+        key = _pkkey(pkname)
+        node = self._ids.get(key)
+        if node is None: node = self._ids[key] = self.__newnode(pkname)
+        return node
+
+    @staticmethod
+    def __aliases(pkinfo):
+        keys = [_pkkey(pkinfo[k]) for k in ('Name', 'FileName', 'SymbolFileName') if pkinfo.get(k)]
+        if not keys: raise EPRError('Wrong package info: {0!r}'.format(pkinfo)[:500])
+        return keys
+
+    def __link(self, src, dst, source):
+        "Add the edge src -> dst (src requires dst) declared by the package 'source'"
+        if src == dst: return
+        sources = self._sources.setdefault((src, dst), set())
+        if not sources:
+            self._requires[src].append(dst)
+            self._requiredby[dst].append(src)
+        sources.add(source)
+
+    def __unlink(self, source):
+        "Drop the edges declared by the package 'source'"
+        for edge in self.__edges(source):
+            sources = self._sources[edge]
+            sources.discard(source)
+            if not sources:
+                del self._sources[edge]
+                self._requires[edge[0]].remove(edge[1])
+                self._requiredby[edge[1]].remove(edge[0])
+
+    def __edges(self, node):
+        "Edges declared by the package 'node' (such edges always start or end at it)"
+        return [(node, dst) for dst in self._requires[node] if node in self._sources[(node, dst)]] + \
+               [(src, node) for src in self._requiredby[node] if node in self._sources[(src, node)]]
+
+    @staticmethod
+    def __walk(node, adjacency, Transitive):
+        "Breadth-first walk of the adjacency lists from 'node' (not included)"
+        if not Transitive: return list(adjacency[node])
+        seen, order, queue = set([node]), [], deque([node])
+        while queue:
+            for other in adjacency[queue.popleft()]:
+                if other not in seen:
+                    seen.add(other)
+                    order.append(other)
+                    queue.append(other)
+        return order
+
+    def __sccs(self):
+        "Strongly connected components of the requires graph (iterative Tarjan algorithm)"
+        index, low, onstack, stack, sccs = {}, {}, set(), [], []
+        for root in xrange(len(self.Names)):
+            if root in index: continue
+            work = [(root, 0)]
+            while work:
+                node, i = work.pop()
+                if i == 0:
+                    index[node] = low[node] = len(index)
+                    stack.append(node)
+                    onstack.add(node)
+                edges = self._requires[node]
+                while i < len(edges):
+                    other = edges[i]
+                    i += 1
+                    if other not in index:
+                        work.append((node, i))
+                        work.append((other, 0))
+                        break
+                    if other in onstack: low[node] = min(low[node], index[other])
+                else:
+                    if low[node] == index[node]:
+                        scc = []
+                        while True:
+                            other = stack.pop()
+                            onstack.discard(other)
+                            scc.append(other)
+                            if other == node: break
+                        sccs.append(scc)
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+        return sccs
+
 #---- COMMON ACTIONS
 
+# file extensions of projects and project groups (see PRCommon.ScanProjects)
+PROJECT_EXTENSIONS = {'.dproj': 'project', '.cbproj': 'project', '.groupproj': 'projectgroup'}
+
+def _chunks(iterable, size):
+    "Generator splitting an iterable into lists of at most 'size' items"
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk: yield chunk
+
+def _failure(func_name, fname, res):
+    """
+    Return the exception of a bulk call: the exception returned by PReq.get_results,
+    an EPRError for a server error message ('ERROR: ...') or None if the call has succeeded.
+    """
+    if isinstance(res, Exception): return res
+    if isinstance(res, basestring) and res.startswith('ERROR: '):
+        return EPRError('{0} has failed for "{1}": {2}'.format(func_name, fname, res))
+    return None
+
+def _scan(Root, Extensions, Recursive=True):
+    "Generator yielding (file name, kind) for the files in Root with the given extensions"
+    for dirpath, dirnames, filenames in os.walk(Root):
+        dirnames.sort()
+        for fname in sorted(filenames):
+            kind = Extensions.get(path.splitext(fname)[1].lower())
+            if kind: yield path.join(dirpath, fname), kind
+        if not Recursive: break
+
 
 class PRCommon(PRObject):
     """
@@ -394,8 +1555,10 @@ class PRCommon(PRObject):
         * IDEPreferredUILanguages:          (string)
         * StartupDirectory:                 (string)
     """
-    def __init__(self):
-        PRObject.__init__(self)
+    BulkChunkSize = 64
+
+    def __init__(self, Req=None):
+        PRObject.__init__(self, Req)
         self.Reload()
 
     def Reload(self):
@@ -403,7 +1566,7 @@ class PRCommon(PRObject):
         Retrieve properties from the object on the server
         and add them as attributes to this class instance.
         """
-        dResult = Req.get_result('IDE_Common_getEnvironment')
+        dResult = self._Req.get_result('IDE_Common_getEnvironment')
         if isinstance(dResult, dict):
             self.__dict__.update(dResult)
         else:
@@ -411,36 +1574,312 @@ class PRCommon(PRObject):
                            'Returned result = {0}'.format(dResult))
 
     def IsProject(self, fname, CheckExists=True):
-        return (path.isfile(fname) and Req.get_result_bool('IDE_Common_IsProject', fname)) \
-                if CheckExists else Req.get_result_bool('IDE_Common_IsProject', fname)
+        return (path.isfile(fname) and self._Req.get_result_bool('IDE_Common_IsProject', fname)) \
+                if CheckExists else self._Req.get_result_bool('IDE_Common_IsProject', fname)
 
     def IsProjectGroup(self, fname, CheckExists=True):
-        return (path.isfile(fname) and Req.get_result_bool('IDE_Common_IsProjectGroup', fname)) \
-                if CheckExists else Req.get_result_bool('IDE_Common_IsProjectGroup', fname)
+        return (path.isfile(fname) and self._Req.get_result_bool('IDE_Common_IsProjectGroup', fname)) \
+                if CheckExists else self._Req.get_result_bool('IDE_Common_IsProjectGroup', fname)
 
     def ExpandRootMacro(self, rootmacro):
-        return Req.get_result('IDE_Common_getExpandRootMacro', rootmacro)
+        return self._Req.get_result('IDE_Common_getExpandRootMacro', rootmacro)
 
     def OpenFile(self, fname):
-        return Req.get_result_bool('IDE_Actions_OpenFile', fname)
+        return self._Req.get_result_bool('IDE_Actions_OpenFile', fname)
 
     def CloseFile(self, fname, SaveBeforeClose=True):
         if SaveBeforeClose: self.SaveFile(fname)
-        return Req.get_result_bool('IDE_Actions_CloseFile', fname)
+        return self._Req.get_result_bool('IDE_Actions_CloseFile', fname)
 
     def CloseAllFiles(self, SaveBeforeClose=True):
-        if SaveBeforeClose: Req.get_result_bool('IDE_MainMenu_ExecuteAction', 'FileSaveAllCommand')
-        return Req.get_result_bool('IDE_MainMenu_ExecuteAction', 'FileCloseAllCommand')
+        if SaveBeforeClose: self._Req.get_result_bool('IDE_MainMenu_ExecuteAction', 'FileSaveAllCommand')
+        return self._Req.get_result_bool('IDE_MainMenu_ExecuteAction', 'FileCloseAllCommand')
 
     def ReloadFile(self, fname):
-        return Req.get_result_bool('IDE_Actions_ReloadFile', fname)
+        return self._Req.get_result_bool('IDE_Actions_ReloadFile', fname)
 
     def SaveFile(self, fname):
-        return Req.get_result_bool('IDE_Actions_SaveFile', fname)
+        return self._Req.get_result_bool('IDE_Actions_SaveFile', fname)
 
     def OpenProject(self, fname, NewProjectGroup=True):
-        return Req.get_result_bool('IDE_Actions_OpenProject', fname, NewProjectGroup)
+        return self._Req.get_result_bool('IDE_Actions_OpenProject', fname, NewProjectGroup)
+
+    #------------------ BULK OPERATIONS ----------------------#
+
+    def OpenFiles(self, fnames):
+        """
+        Bulk version of OpenFile: take an iterable of file names and return
+        an ordered dictionary: file name -> result (bool, or the exception
+        if the call has failed, EPRError for a server error message). The calls are sent concurrently
+        (see PReq.get_results) in chunks of BulkChunkSize files.
+        """
+        return OrderedDict(self.__bulk('IDE_Actions_OpenFile', fnames))
+
+    def SaveFiles(self, fnames):
+        "Bulk version of SaveFile (see OpenFiles)"
+        return OrderedDict(self.__bulk('IDE_Actions_SaveFile', fnames))
+
+    def ReloadFiles(self, fnames):
+        "Bulk version of ReloadFile (see OpenFiles)"
+        return OrderedDict(self.__bulk('IDE_Actions_ReloadFile', fnames))
+
+    def CloseFiles(self, fnames, SaveBeforeClose=True):
+        """
+        Bulk version of CloseFile (see OpenFiles): the files of each chunk
+        are saved in one concurrent batch (if SaveBeforeClose is True)
+        and then closed in another.
+        """
+        results = OrderedDict()
+        for chunk in _chunks(fnames, self.BulkChunkSize):
+            if SaveBeforeClose: list(self.__bulk('IDE_Actions_SaveFile', chunk))
+            results.update(self.__bulk('IDE_Actions_CloseFile', chunk))
+        return results
+
+    def AreProjects(self, fnames, CheckExists=True):
+        """
+        Bulk version of IsProject (see OpenFiles). If CheckExists is True,
+        missing files are reported as False without server calls.
+        """
+        return OrderedDict(self.__bulk('IDE_Common_IsProject', fnames, CheckExists=CheckExists))
+
+    def AreProjectGroups(self, fnames, CheckExists=True):
+        "Bulk version of IsProjectGroup (see AreProjects)"
+        return OrderedDict(self.__bulk('IDE_Common_IsProjectGroup', fnames, CheckExists=CheckExists))
+
+    def ScanProjects(self, Root, Extensions=PROJECT_EXTENSIONS, Recursive=True):
+        """
+        Generator scanning a source tree for projects and project groups.
+        The candidate files are found locally (walking the directory 'Root',
+        recursively if Recursive is True) by their extensions: 'Extensions'
+        maps lower-cased extensions to the kinds of files they may hold
+        ('project' or 'projectgroup', see PROJECT_EXTENSIONS). The candidates
+        are then checked by the server (IsProject / IsProjectGroup) concurrently,
+        in chunks of BulkChunkSize files, and the results are yielded
+        as each chunk completes: tuples (file name, kind), where 'kind' is
+        'project', 'projectgroup', None if the server has rejected the file,
+        or the exception if the call has failed (EPRError if the server
+        has returned an error message).
+        """
+        funcs = {'project': 'IDE_Common_IsProject', 'projectgroup': 'IDE_Common_IsProjectGroup'}
+        for chunk in _chunks(_scan(Root, Extensions, Recursive), self.BulkChunkSize):
+            results = self._Req.get_results([(funcs[kind], (fname,)) for fname, kind in chunk])
+            for (fname, kind), res in zip(chunk, results):
+                err = _failure(funcs[kind], fname, res)
+                yield fname, err if err is not None else (kind if res is True else None)
+
+    def __bulk(self, func_name, fnames, CheckExists=False):
+        """
+        Generator calling func_name(fname) for each file name in concurrent
+        chunks (see PReq.get_results) and yielding (file name, result) pairs.
+        """
+        for chunk in _chunks(fnames, self.BulkChunkSize):
+            calls = [fname for fname in chunk if not CheckExists or path.isfile(fname)]
+            results = dict(zip(calls, self._Req.get_results([(func_name, (fname,)) for fname in calls])))
+            for fname in chunk:
+                res = results.get(fname, False)
+                err = _failure(func_name, fname, res)
+                yield fname, err if err is not None else (res is True)
+
+
+#---- MAIN MENU INDEX
+
+class PRMenuItem(object):
+    """
+    Item of the IDE main menu tree (see PRMenuIndex).
+    ------------------------------------------------------------
+    Available properties:
+        * Caption:      (string) item caption (with the '&' characters stripped)
+        * Action:       (string) name of the IDE action tied to the item (or None)
+        * Parent:       (PRMenuItem) parent item (None for the root)
+        * Children:     (OrderedDict) lower-cased caption -> child item
+        * Path:         (string) 'absolute caption path' (see PRMainMenu.ExecuteMenuItem)
+    """
+    __slots__ = ('Caption', 'Action', 'Parent', 'Children', '__weakref__')
+
+    def __init__(self, Caption='', Parent=None, Action=None):
+        self.Caption = Caption
+        self.Action = Action
+        self.Parent = Parent
+        self.Children = OrderedDict()
+
+    def GetPath(self, Delimiter='|'):
+        captions = []
+        item = self
+        while item.Parent is not None:
+            captions.append(item.Caption)
+            item = item.Parent
+        return Delimiter.join(reversed(captions))
+
+    Path = property(GetPath)
+
+    def __iter__(self):
+        """
+        <Iteration protocol>
+        Yield all the items below this one (depth-first, in the menu order).
+        """
+        for child in self.Children.values():
+            yield child
+            for item in child: yield item
+
+    def __repr__(self):
+        return 'PRMenuItem({0!r}{1})'.format(self.Path, ', {0!r}'.format(self.Action) if self.Action else '')
+
+class PRMenuIndex(object):
+    """
+    Indexed tree of the IDE main menu, built from the menu text
+    (see PRMainMenu.MenuToStr and ActionsToFile): one caption per line,
+    nested items indented deeper than their parent, and optionally the action
+    name appended to the caption in square brackets. Each level of the tree
+    is a hash table of the lower-cased captions, so a caption path is resolved
+    in O(depth) time; the actions are indexed by their lower-cased names.
+    The tree is only rebuilt when the menu text changes (see 'update').
+    ------------------------------------------------------------
+    Available properties:
+        * Fingerprint:      SHA-1 hex digest of the indexed menu and actions texts
+        * MenuFingerprint:  SHA-1 hex digest of the indexed menu text
+        * ActionsFile:      file the action names are read from (see PRMainMenu.GetIndex)
+        * IndexedFile:      file the indexed action names have been read from
+        * Time:             time the menu was last checked for changes (None if never)
+    """
+    def __init__(self):
+        self.Root = PRMenuItem()
+        self.Fingerprint = self.MenuFingerprint = None
+        self.ActionsFile = self.IndexedFile = None
+        self.Time = None
+        self._actions = {}
+
+    @staticmethod
+    def fingerprint(*texts):
+        "SHA-1 hex digest of the texts (None items are skipped)"
+        digest = hashlib.sha1()
+        for text in texts:
+            if text is None: continue
+            digest.update(text.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def update(self, menu, actions=None):
+        """
+        Rebuild the tree from the menu text and (optionally) the text with the
+        action names, if their fingerprint has changed since the last update.
+        Returns True if the tree has been rebuilt.
+        """
+        self.Time = time.time()
+        fp = self.fingerprint(menu, actions)
+        if fp == self.Fingerprint: return False
+        root = self.__parse(menu)
+        if actions:
+            for item in self.__parse(actions):
+                if item.Action is None: continue
+                target = self.__find(root, [it.Caption for it in self.__chain(item)])
+                if target is not None: target.Action = item.Action
+        self.Root, self.Fingerprint, self.MenuFingerprint = root, fp, self.fingerprint(menu)
+        self._actions = {}
+        for item in root:
+            if item.Action: self._actions.setdefault(item.Action.lower(), item)
+        return True
+
+    def find(self, ItemText, Delimiter='|'):
+        """
+        Return the item (PRMenuItem) given by its 'absolute caption path'
+        (case-insensitive, '&' characters are ignored), or None if not found.
+        """
+        return self.__find(self.Root, ItemText.split(Delimiter))
+
+    def find_action(self, ActionName):
+        "Return the item tied to an IDE action (case-insensitive), or None if not found"
+        return self._actions.get(ActionName.lower())
+
+    @property
+    def Actions(self):
+        "Dictionary: action name -> caption path (see PRMenuItem.Path)"
+        return dict((item.Action, item.Path) for item in self._actions.values())
+
+    def complete(self, Prefix, Delimiter='|'):
+        """
+        Return the items whose caption paths start with Prefix (case-insensitive),
+        e.g. 'File|Re' -> [File|Reopen, File|Revert...], walking the tree along
+        the complete captions of the prefix.
+        """
+        captions = Prefix.split(Delimiter)
+        parent = self.__find(self.Root, captions[:-1])
+        if parent is None: return []
+        last = captions[-1].replace('&', '').strip().lower()
+        return [child for key, child in parent.Children.items() if key.startswith(last)]
 
+    def search(self, Query, Limit=10, Cutoff=0.6):
+        """
+        Fuzzy search over the item captions: return at most Limit items,
+        best matches first. Captions containing Query (case-insensitive)
+        match best; the others are ranked by their similarity to Query
+        (see difflib.SequenceMatcher) and dropped if it is below Cutoff.
+        """
+        from difflib import SequenceMatcher
+        query = Query.replace('&', '').strip().lower()
+        matcher = SequenceMatcher()
+        matcher.set_seq2(query)
+        scored = []
+        for n, item in enumerate(self.Root):
+            caption = item.Caption.lower()
+            if query in caption:
+                score = 2.0 - caption.index(query) / (len(caption) + 1.0)
+            else:
+                matcher.set_seq1(caption)
+                if matcher.real_quick_ratio() < Cutoff or matcher.quick_ratio() < Cutoff: continue
+                score = matcher.ratio()
+                if score < Cutoff: continue
+            scored.append((-score, n, item))
+        scored.sort(key=lambda x: x[:2])
+        return [item for _, _, item in scored[:Limit]]
+
+    def __len__(self):
+        return sum(1 for _ in self.Root)
+
+    def __iter__(self):
+        return iter(self.Root)
+
+    def __contains__(self, ItemText):
+        return self.find(ItemText) is not None
+
+    #------------------ PRIVATE METHODS ----------------------#
+
+    @staticmethod
+    def __parse(text):
+        root = PRMenuItem()
+        stack = [(-1, root)]
+        for line in text.splitlines():
+            caption = line.strip()
+            if not caption: continue
+            indent = len(line) - len(line.lstrip())
+            action = None
+            if caption.endswith(']') and (' [' in caption):
+                caption, _, action = caption[:-1].rpartition(' [')
+                caption = caption.rstrip()
+            caption = caption.replace('&', '')
+            while stack[-1][0] >= indent: stack.pop()
+            parent = stack[-1][1]
+            item = PRMenuItem(caption, parent, action or None)
+            parent.Children.setdefault(caption.lower(), item)
+            stack.append((indent, item))
+        return root
+
+    @staticmethod
+    def __find(item, captions):
+        for caption in captions:
+            item = item.Children.get(caption.replace('&', '').strip().lower())
+            if item is None: return None
+        return item
+
+    @staticmethod
+    def __chain(item):
+        chain = []
+        while item.Parent is not None:
+            chain.append(item)
+            item = item.Parent
+        return reversed(chain)
+
+_menuindices = weakref.WeakKeyDictionary()
+_menuindices_lock = threading.Lock()
 
 #---- MAIN MENU & IDE ACTIONS
 
@@ -451,9 +1890,14 @@ class PRMainMenu(PRObject):
     The most common operations are 'ExecuteMenuItem' - the method to
     call a menu item given its 'absolute caption path' (see function description),
     and 'ExecuteAction' - to execute an internal IDE action given its name.
+    Menu paths and action names can be looked up, completed and validated
+    locally on the indexed menu tree (see GetIndex and PRMenuIndex).
     """
-    def __init__(self):
-        PRObject.__init__(self)
+    # seconds during which a validation miss does not update the menu tree (see __validate)
+    ValidateMaxAge = 10.0
+
+    def __init__(self, Req=None):
+        PRObject.__init__(self, Req)
 
     @property
     def LastError(self):
@@ -465,22 +1909,73 @@ class PRMainMenu(PRObject):
         exist, or overwriting if otherwise). This method is helpful to have
         all the menu captions at hand, ready to be passed to 'ExecuteMenuItem'.
         """
-        return Req.get_result_bool('IDE_MainMenu_WriteToFile', fname)
+        return self._Req.get_result_bool('IDE_MainMenu_WriteToFile', fname)
 
     def MenuToStr(self):
         """
         Same as 'MenuToFile', but outputs to a string rather than a file.
         """
-        return pyrad.tostr(Req.get_result('IDE_MainMenu_getValue', 'MainMenuString'))
+        return pyrad.tostr(self._Req.get_result('IDE_MainMenu_getValue', 'MainMenuString'))
+
+    def IterMenu(self):
+        """
+        Same as 'MenuToStr', but returns a generator yielding the menu lines
+        as they arrive from the server (the response is streamed).
+        """
+        return self._Req.get_result('IDE_MainMenu_getValue', 'MainMenuString', stream=True)
 
     def ActionsToFile(self, fname):
         """
         Same as 'MenuToFile', but appends action names to menu item captions,
         so that an action name may be passed to 'ExecuteAction'.
         """
-        return Req.get_result_bool('IDE_MainMenu_WriteActionsToFile', fname)
+        return self._Req.get_result_bool('IDE_MainMenu_WriteActionsToFile', fname)
+
+    def GetIndex(self, ActionsFile=None, Update=True, MaxAge=None):
+        """
+        Return the indexed menu tree (see PRMenuIndex) kept for the client.
+        If Update is True (or the tree has not been built yet), the menu text
+        is retrieved (one request) and the tree is rebuilt if the text has changed,
+        unless the menu has been checked less than MaxAge seconds ago (if given).
+        To index the action names, pass in 'ActionsFile' a file name that is written
+        by the IDE (see ActionsToFile) and can be read by this process
+        (e.g. a local file if the IDE runs on the same machine, or a shared one).
+        The file name is kept for the next updates. The actions are only written
+        and read again if the menu text has changed or the file name is new.
+        """
+        with _menuindices_lock:
+            index = _menuindices.get(self._Req)
+            if index is None: index = _menuindices[self._Req] = PRMenuIndex()
+        if ActionsFile: index.ActionsFile = ActionsFile
+        ActionsFile = index.ActionsFile
+        if (index.Fingerprint is not None) and (not Update or ((MaxAge is not None) and
+                                                 (time.time() - index.Time < MaxAge))):
+            return index
+        menu = self.MenuToStr()
+        if (index.MenuFingerprint == PRMenuIndex.fingerprint(menu)) and (index.IndexedFile == ActionsFile):
+            index.Time = time.time()
+            return index
+        actions = None
+        if ActionsFile:
+            if not self.ActionsToFile(ActionsFile):
+                raise EPRError('Error writing the IDE actions to "{0}"!\n{1}'.format(ActionsFile, self.LastError))
+            with open(ActionsFile, 'rb') as ifile: actions = ifile.read()
+            try:
+                actions = actions.decode('utf-8-sig')
+            except UnicodeDecodeError:
+                actions = actions.decode('latin-1')
+        index.update(menu, actions)
+        index.IndexedFile = ActionsFile
+        return index
+
+    def FindMenuItems(self, Query, Limit=10):
+        """
+        Fuzzy search over the menu item captions (see PRMenuIndex.search),
+        made locally on the menu tree built on first call (see GetIndex).
+        """
+        return self.GetIndex(Update=False).search(Query, Limit)
 
-    def ExecuteMenuItem(self, ItemText, Delimiter='|'):
+    def ExecuteMenuItem(self, ItemText, Delimiter='|', Validate=False):
         """
         Executes an item in the IDE menu - just as if that item is clicked.
         The item is passed in 'ItemText' as an 'absolute caption path', i.e.
@@ -489,15 +1984,35 @@ class PRMainMenu(PRObject):
         E.g. if Delimiter == '|' (by default), the Replace dialog can be accessed as
         'Search|Replace...'. Ampersand characters ('&') used for keyboard control
         are stripped, so 'ItemText' is passed without these, e.g. 'Reopen' and NOT '&Reopen'.
+        If Validate is True, the path is first checked locally against the menu tree
+        (see GetIndex), and EPRError is raised if it is not found there (even after
+        the tree is updated), listing the closest captions.
         """
-        return Req.get_result_bool('IDE_MainMenu_ExecuteMenuItem', ItemText, Delimiter)
+        if Validate and (self.__validate(lambda index: index.find(ItemText, Delimiter)) is None):
+            raise EPRError('Menu item "{0}" not found! Closest items: {1}'.format(ItemText,
+                           [item.GetPath(Delimiter) for item in self.FindMenuItems(ItemText.split(Delimiter)[-1], 5)]))
+        return self._Req.get_result_bool('IDE_MainMenu_ExecuteMenuItem', ItemText, Delimiter)
 
-    def ExecuteAction(self, ActionName):
+    def ExecuteAction(self, ActionName, Validate=False):
         """
         Executes an internal IDE action given its name. All the action names
         tied to menu items can be retrieved using the 'ActionsToFile' method.
+        If Validate is True, the action name is first checked locally against
+        the actions indexed by GetIndex (which must be given ActionsFile beforehand),
+        and EPRError is raised if it is not found there (even after the tree is updated).
+        """
+        if Validate and (self.__validate(lambda index: index.find_action(ActionName)) is None):
+            raise EPRError('Action "{0}" not found in the IDE menu!'.format(ActionName))
+        return self._Req.get_result_bool('IDE_MainMenu_ExecuteAction', ActionName)
+
+    def __validate(self, find):
+        """
+        Look up an item in the menu tree, updating the tree once if it
+        is not found and the menu has not been checked for ValidateMaxAge
+        seconds (the menu may have changed since the tree was built).
         """
-        return Req.get_result_bool('IDE_MainMenu_ExecuteAction', ActionName)
+        item = find(self.GetIndex(Update=False))
+        return item if item is not None else find(self.GetIndex(MaxAge=self.ValidateMaxAge))
 
     def __str__(self):
         """
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyradfleet
+# Purpose:     run PyRAD operations on many RAD Studio (DataSnap) servers at once
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+from __future__ import print_function
+import pyrad, pyradclasses as PyRAD, threading
+from multiprocessing.pool import ThreadPool
+from collections import OrderedDict
+
+#-------------------------------------------------------------------------------
+
+DEFAULT_FLEETWIDTH = 16         # default max number of hosts processed at the same time
+
+#-------------------------------------------------------------------------------
+
+class EFleetError(pyrad.EGenericError):
+    "Exception class for this module (pyradfleet)"
+    pass
+
+class PRHostResult(object):
+    """
+    Result of an operation on a single host of the fleet.
+    ------------------------------------------------------------
+    Available properties:
+        * Host:     (string) host name (see PRFleet)
+        * Result:   result returned by the operation (None on failure)
+        * Error:    exception raised by the operation or by the connection
+                    to the host, or EFleetError if the operation has returned
+                    a server error message ('ERROR: ...'); None on success
+        * Time:     (float) operation time in seconds (including the connection
+                    to the host if it has been made by this operation)
+        * Ok:       (bool) whether the operation has succeeded
+    """
+    __slots__ = ('Host', 'Result', 'Error', 'Time')
+
+    def __init__(self, Host, Result=None, Error=None, Time=0.0):
+        self.Host = Host
+        self.Result = Result
+        self.Error = Error
+        self.Time = Time
+
+    @property
+    def Ok(self):
+        return self.Error is None
+
+    def __repr__(self):
+        return 'PRHostResult({0!r}, {1}, {2:.3f} s)'.format(self.Host,
+            'OK: {0!r}'.format(self.Result) if self.Ok else 'ERROR: {0}'.format(self.Error), self.Time)
+
+#-------------------------------------------------------------------------------
+
+class PRFleet(object):
+    """
+    A fleet of RAD Studio servers that can be scripted together.
+    The fleet is created from a list of DSConfig dictionaries (see PReq);
+    each host is named by the optional 'Name' DSConfig key or as 'Hostname:Port'.
+    A client (PReq object) is created for each host on first use and kept open
+    (warm) for the next operations, until 'close' is called.
+    Operations are functions taking the client as the first argument
+    (e.g. 'lambda Req: PyRAD.PRPackages(Req=Req).Count'), run on all the hosts
+    (or the chosen ones) in parallel by a pool of at most 'Width' threads.
+    Usage:
+        with PRFleet([DSConfig1, DSConfig2]) as Fleet:
+            for res in Fleet.Install('c:/packages/mypackage.bpl'):
+                print(res.Host, res.Ok, res.Time)
+    A failed host does not abort the operation: its result holds the error,
+    and the connection is retried by the next operation.
+    """
+    def __init__(self, DSConfigs, Width=DEFAULT_FLEETWIDTH):
+        """
+        <Constructor>
+        Assign the host settings. No connections are made here.
+        """
+        self.DSConfigs = _hosts(DSConfigs)
+        self.Width = int(Width)
+        self._clients = {}
+        self._locks = dict((host, threading.Lock()) for host in self.DSConfigs)
+        self._pool = None
+
+    @property
+    def Hosts(self):
+        "List of the host names"
+        return list(self.DSConfigs.keys())
+
+    def __len__(self):
+        return len(self.DSConfigs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def client(self, host):
+        """
+        Return the client (PReq object) of a host, connecting to it if needed.
+        Raises EGenericError if the connection fails.
+        """
+        if host not in self.DSConfigs:
+            raise EFleetError('Unknown host "{0}"!'.format(host))
+        with self._locks[host]:
+            Req = self._clients.get(host)
+            if Req is None:
+                Req = self._clients[host] = PyRAD.Connect(self.DSConfigs[host])
+            return Req
+
+    def close(self):
+        """
+        Close the connections to all the hosts and stop the worker threads.
+        The fleet remains usable: the hosts are reconnected on the next operation.
+        """
+        for host in list(self._clients.keys()):
+            Req = self._clients.pop(host, None)
+            if Req is not None: Req.close()
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+
+    def map(self, func, *args, **kwargs):
+        """
+        Run func(Req, *args, **kwargs) on the hosts in parallel (Req being
+        the host client) and return an iterator yielding the host results
+        (PRHostResult) as they complete. The hosts can be chosen by the
+        'Hosts' keyword argument (list of host names, all the hosts by default).
+        """
+        hosts = kwargs.pop('Hosts', None)
+        hosts = self.Hosts if hosts is None else list(hosts)
+        for host in hosts:
+            if host not in self.DSConfigs:
+                raise EFleetError('Unknown host "{0}"!'.format(host))
+        if not hosts: return iter(())
+        if self._pool is None: self._pool = ThreadPool(min(self.Width, len(self.DSConfigs)))
+        return self._pool.imap_unordered(lambda host: self.__run(host, func, args, kwargs), hosts)
+
+    def run(self, func, *args, **kwargs):
+        """
+        Same as 'map', but wait for all the hosts to complete and return
+        a dictionary: host name -> PRHostResult (in the order of hosts).
+        """
+        results = dict((res.Host, res) for res in self.map(func, *args, **kwargs))
+        return OrderedDict((host, results[host]) for host in self.Hosts if host in results)
+
+    #------------------ OPERATIONS ----------------------#
+
+    def Connect(self, **kwargs):
+        """
+        Connect to the hosts (if not yet connected), returning True for each.
+        """
+        return self.map(lambda Req: True, **kwargs)
+
+    def Install(self, fname, **kwargs):
+        "Install the package given by its full file name (see PRPackages.Install)"
+        return self.map(lambda Req: PyRAD.PRPackages(Req=Req).Install(fname), **kwargs)
+
+    def Uninstall(self, fname, **kwargs):
+        "Uninstall the package given by its (file) name (see PRPackages.Uninstall)"
+        return self.map(lambda Req: PyRAD.PRPackages(Req=Req).Uninstall(fname), **kwargs)
+
+    def IsInstalled(self, fname, **kwargs):
+        "Check if the package given by its (file) name is installed"
+        return self.map(lambda Req: PyRAD.PRPackages(Req=Req).IsInstalled(fname), **kwargs)
+
+    def OpenProject(self, fname, NewProjectGroup=True, **kwargs):
+        "Open a project (see PRCommon.OpenProject)"
+        return self.map(lambda Req: PyRAD.PRCommon(Req).OpenProject(fname, NewProjectGroup), **kwargs)
+
+    def ExecuteAction(self, ActionName, **kwargs):
+        "Execute an IDE action (see PRMainMenu.ExecuteAction)"
+        return self.map(lambda Req: PyRAD.PRMainMenu(Req).ExecuteAction(ActionName), **kwargs)
+
+    def Inventory(self, **kwargs):
+        """
+        Collect the inventory of each host: a dictionary with the keys
+        'Environment' (IDE_Common_getEnvironment result) and 'Packages'
+        (list of package infos, retrieved in one concurrent batch).
+        """
+        return self.map(_inventory, **kwargs)
+
+    #------------------ PRIVATE METHODS ----------------------#
+
+    def __run(self, host, func, args, kwargs):
+        """
+        Run an operation on a single host, catching all the errors
+        (a server error message returned by the operation is a failure too).
+        """
+        t0 = pyrad.timer()
+        try:
+            Res = func(self.client(host), *args, **kwargs)
+        except Exception as err:
+            return PRHostResult(host, None, err, pyrad.timer() - t0)
+        if isinstance(Res, pyrad.basestring) and Res.startswith('ERROR: '):
+            return PRHostResult(host, None, EFleetError('The operation has failed on "{0}": {1}'.format(host, Res)),
+                                pyrad.timer() - t0)
+        return PRHostResult(host, Res, None, pyrad.timer() - t0)
+
+#-------------------------------------------------------------------------------
+
+def _hosts(DSConfigs):
+    """
+    Return an ordered dictionary: host name -> DSConfig, naming each host
+    by the 'Name' DSConfig key or as 'Hostname:Port'.
+    """
+    hosts = OrderedDict()
+    for DSConfig in DSConfigs:
+        if not isinstance(DSConfig, dict):
+            raise EFleetError('Wrong host settings (DSConfig) passed to PRFleet: {0}!'.format(DSConfig))
+        host = DSConfig.get('Name') or '{0}:{1}'.format(DSConfig.get('Hostname'), DSConfig.get('Port'))
+        if host in hosts:
+            raise EFleetError('Duplicate host "{0}"!'.format(host))
+        hosts[host] = DSConfig
+    return hosts
+
+def _inventory(Req):
+    "Fleet operation collecting the environment and packages of a host (see PRFleet.Inventory)"
+    pks = PyRAD.PRPackages(Snapshot=True, Req=Req)
+    return {'Environment': dict((k, v) for k, v in PyRAD.PRCommon(Req).__dict__.items() if k[:1] != '_'),
+            'Packages': [pk._pkinfo for pk in pks]}
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyradfleet_test
+# Purpose:     tests of the server fleet (PRFleet) against fake DataSnap
+#              servers (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyrad, pyradfleet, pytest
+from pyrad_fakeserver import FakeDSServer
+
+#-------------------------------------------------------------------------------
+
+@pytest.fixture
+def fleet():
+    "Fleet of two fake servers (named 'a' and 'b') and an unreachable host ('down')"
+    with FakeDSServer(Packages=5) as ServerA, FakeDSServer(Packages=8) as ServerB:
+        DSConfigs = [dict(ServerA.DSConfig, Name='a'), dict(ServerB.DSConfig, Name='b'),
+                     {'Hostname': '127.0.0.1', 'Port': 1, 'URL': 'x', 'Name': 'down'}]
+        with pyradfleet.PRFleet(DSConfigs, Width=3) as Fleet:
+            yield Fleet
+
+def test_fleet_run(fleet):
+    results = fleet.run(lambda Req: Req.get_result('IDE_Packages_getCount'))
+    assert list(results) == ['a', 'b', 'down']
+    assert [(res.Ok, res.Result) for res in results.values()] == [(True, 5), (True, 8), (False, None)]
+    assert isinstance(results['down'].Error, pyrad.EGenericError)
+
+def test_fleet_error_messages(fleet):
+    results = fleet.run(lambda Req: Req.get_result('IDE_Packages_getCompCount', 99), Hosts=['a', 'b'])
+    for res in results.values():
+        assert not res.Ok and res.Result is None
+        assert isinstance(res.Error, pyradfleet.EFleetError)
+        assert 'Wrong package index 99' in str(res.Error)
+
+def test_fleet_operations(fleet):
+    hosts = ['a', 'b']
+    assert all(res.Result is True for res in fleet.Install('c:\\x\\new1.bpl', Hosts=hosts))
+    assert all(res.Result is True for res in fleet.IsInstalled('new1.bpl', Hosts=hosts))
+    inventory = fleet.run(pyradfleet._inventory, Hosts=hosts)
+    assert [len(res.Result['Packages']) for res in inventory.values()] == [6, 9]
+    # the clients are kept open between the operations
+    assert fleet.client('a') is fleet.client('a')
+
+def test_fleet_hosts():
+    with pytest.raises(pyradfleet.EFleetError):
+        pyradfleet.PRFleet([{'Hostname': 'h', 'Port': 1}, {'Hostname': 'h', 'Port': 1}])
+    Fleet = pyradfleet.PRFleet([{'Hostname': 'h', 'Port': 1}])
+    assert Fleet.Hosts == ['h:1']
+    with pytest.raises(pyradfleet.EFleetError):
+        Fleet.run(lambda Req: True, Hosts=['other'])
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyradinventory
+# Purpose:     persistent (SQLite) snapshot of the IDE state for offline queries
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+from __future__ import print_function
+import pyrad, json, time, hashlib, sqlite3, threading
+from pyrad import basestring
+
+#-------------------------------------------------------------------------------
+
+INVENTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    product TEXT NOT NULL, regkey TEXT NOT NULL,
+    fingerprint TEXT NOT NULL, time REAL NOT NULL,
+    environment TEXT NOT NULL, menu TEXT, components INTEGER NOT NULL,
+    PRIMARY KEY (product, regkey));
+CREATE TABLE IF NOT EXISTS packages (
+    product TEXT NOT NULL, regkey TEXT NOT NULL, idx INTEGER NOT NULL,
+    name TEXT NOT NULL COLLATE NOCASE, info TEXT NOT NULL,
+    PRIMARY KEY (product, regkey, idx));
+CREATE INDEX IF NOT EXISTS packages_name ON packages (product, regkey, name);
+CREATE TABLE IF NOT EXISTS components (
+    product TEXT NOT NULL, regkey TEXT NOT NULL, package INTEGER NOT NULL,
+    idx INTEGER NOT NULL, name TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (product, regkey, package, idx));
+CREATE INDEX IF NOT EXISTS components_name ON components (product, regkey, name);
+"""
+
+#-------------------------------------------------------------------------------
+
+class EInventoryError(pyrad.EGenericError):
+    "Exception class for this module (pyradinventory)"
+    pass
+
+def fingerprint(environment, pknames):
+    """
+    Fingerprint of the IDE state used to validate a snapshot: SHA-1 hex digest
+    of the product identifier, base registry key and the package names (in order).
+    The Loaded states of the packages are not included, since checking them
+    takes a request per package.
+    """
+    data = json.dumps([environment.get('ProductIdentifier'), environment.get('BaseRegistryKey'),
+                       list(pknames)], separators=(',', ':'))
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+def _key(environment):
+    "Snapshot key: (ProductIdentifier, BaseRegistryKey)"
+    try:
+        return (environment['ProductIdentifier'], environment['BaseRegistryKey'])
+    except (KeyError, TypeError):
+        raise EInventoryError('Wrong IDE environment: {0!r}'.format(environment)[:500])
+
+def _check(func_name, Res, types):
+    if isinstance(Res, Exception): raise Res
+    if not isinstance(Res, types):
+        raise EInventoryError('Error loading {0}!\nReturned result = {1}'.format(func_name, Res)[:500])
+    return Res
+
+#-------------------------------------------------------------------------------
+
+class PRInventory(object):
+    """
+    Snapshot of the IDE state (environment, package infos, component names
+    and the main menu) kept in an SQLite database file, so that it can be
+    queried without the server. The database may hold snapshots of several IDEs,
+    each keyed by ProductIdentifier and BaseRegistryKey (see PRCommon)
+    and validated by a fingerprint (see 'fingerprint').
+    Usage:
+        # validate the stored snapshot (2 requests), retaking it only if stale
+        Inventory = PRInventory.load(Req, 'pyrad_inventory.db')
+        # or open it offline
+        Inventory = PRInventory.open('pyrad_inventory.db', 'Delphi', 'Software\\Embarcadero\\BDS\\23.0')
+        print(Inventory.FindComponent('TMyButton'))
+    ------------------------------------------------------------
+    Available properties:
+        * DBFile:           (string) database file name
+        * Key:              (tuple) (ProductIdentifier, BaseRegistryKey)
+        * Fingerprint:      (string) fingerprint of the snapshot
+        * Time:             (float) time the snapshot has been taken (see time.time)
+        * Environment:      (dict) IDE environment (see PRCommon)
+        * HasComponents:    (bool) whether the component names have been stored
+    """
+    def __init__(self, DBFile, ProductIdentifier, BaseRegistryKey):
+        """
+        <Constructor>
+        Open the snapshot stored for the given IDE in the database file.
+        Raises EInventoryError if there is no such snapshot.
+        """
+        self.DBFile = DBFile
+        self.Key = (ProductIdentifier, BaseRegistryKey)
+        self._db = _connect(DBFile)
+        self._lock = threading.Lock()
+        row = self.__query('SELECT fingerprint, time, environment, components FROM snapshots '
+                           'WHERE product = ? AND regkey = ?', one=True)
+        if row is None:
+            self._db.close()
+            raise EInventoryError('No inventory snapshot for {0} ({1}) in "{2}"!'.format(
+                                  ProductIdentifier, BaseRegistryKey, DBFile))
+        self.Fingerprint, self.Time = row[0], row[1]
+        self.Environment = json.loads(row[2])
+        self.HasComponents = bool(row[3])
+
+    @classmethod
+    def open(cls, DBFile, ProductIdentifier, BaseRegistryKey):
+        "Same as the constructor (open the stored snapshot without the server)"
+        return cls(DBFile, ProductIdentifier, BaseRegistryKey)
+
+    @classmethod
+    def load(cls, Req, DBFile, MaxAge=None, Components=None, MainMenu=True):
+        """
+        Return the snapshot of the IDE served by the client Req, taking it
+        from the database file if it is still valid. The IDE environment
+        is retrieved to find the snapshot (one request); the snapshot is used
+        if it is younger than MaxAge seconds (if given) or if its fingerprint
+        matches the current package names (one more request). Otherwise
+        a new snapshot is taken (see 'save') and stored in the file.
+        The component names are stored if Components is True, or if they have been
+        stored in the previous snapshot and Components is None.
+        """
+        environment = _check('IDE_Common_getEnvironment', Req.get_result('IDE_Common_getEnvironment'), dict)
+        key = _key(environment)
+        try:
+            inventory = cls(DBFile, *key)
+        except EInventoryError:
+            inventory = None
+        if inventory is not None:
+            if Components is None: Components = inventory.HasComponents
+            if ((MaxAge is not None) and (time.time() - inventory.Time < MaxAge)) or \
+               (inventory.Fingerprint == fingerprint(environment, _pknames(Req))):
+                if not Components or inventory.HasComponents: return inventory
+            inventory.close()
+        return cls.save(Req, DBFile, bool(Components), MainMenu, environment)
+
+    @classmethod
+    def save(cls, Req, DBFile, Components=False, MainMenu=True, environment=None):
+        """
+        Take a snapshot of the IDE served by the client Req and store it
+        in the database file (replacing the previous snapshot of the same IDE).
+        The package infos (and the component names if Components is True)
+        are retrieved concurrently (see PReq.get_results). Returns the snapshot.
+        """
+        if environment is None:
+            environment = _check('IDE_Common_getEnvironment', Req.get_result('IDE_Common_getEnvironment'), dict)
+        key = _key(environment)
+        pknames = _pknames(Req)
+        pkinfos = [_check('IDE_Packages_getPackageInfo', res, dict) for res in
+                   Req.get_results([('IDE_Packages_getPackageInfo', (i,)) for i in range(len(pknames))])]
+        components = []
+        if Components:
+            counts = [_check('IDE_Packages_getCompCount', res, int) for res in
+                      Req.get_results([('IDE_Packages_getCompCount', (i,)) for i in range(len(pknames))])]
+            calls = [('IDE_Packages_getCompName', (i, j)) for i, count in enumerate(counts) for j in range(count)]
+            components = [key + (call[1][0], call[1][1], _check('IDE_Packages_getCompName', res, basestring))
+                          for call, res in zip(calls, Req.get_results(calls))]
+        menu = pyrad.tostr(Req.get_result('IDE_MainMenu_getValue', 'MainMenuString')) if MainMenu else None
+        db = _connect(DBFile)
+        try:
+            with db:
+                for table in ('snapshots', 'packages', 'components'):
+                    db.execute('DELETE FROM {0} WHERE product = ? AND regkey = ?'.format(table), key)
+                db.execute('INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?)', key +
+                           (fingerprint(environment, pknames), time.time(), json.dumps(environment),
+                            menu, int(bool(Components))))
+                db.executemany('INSERT INTO packages VALUES (?, ?, ?, ?, ?)',
+                               [key + (i, pkinfo.get('Name', pkname), json.dumps(pkinfo))
+                                for i, (pkname, pkinfo) in enumerate(zip(pknames, pkinfos))])
+                db.executemany('INSERT INTO components VALUES (?, ?, ?, ?, ?)', components)
+        finally:
+            db.close()
+        return cls(DBFile, *key)
+
+    @staticmethod
+    def keys(DBFile):
+        "List of the snapshot keys (ProductIdentifier, BaseRegistryKey) stored in the database file"
+        db = _connect(DBFile)
+        try:
+            return [tuple(row) for row in db.execute('SELECT product, regkey FROM snapshots ORDER BY 1, 2')]
+        finally:
+            db.close()
+
+    def close(self):
+        "Close the database connection"
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def IsStale(self, Req):
+        """
+        Check if the snapshot no longer matches the IDE served by the client Req
+        (two requests: the environment and the package names).
+        """
+        environment = _check('IDE_Common_getEnvironment', Req.get_result('IDE_Common_getEnvironment'), dict)
+        return (_key(environment) != self.Key) or \
+               (fingerprint(environment, _pknames(Req)) != self.Fingerprint)
+
+    #------------------ QUERIES ----------------------#
+
+    @property
+    def PackageNames(self):
+        "List of the package names (in the IDE order)"
+        return [row[0] for row in self.__query('SELECT name FROM packages WHERE product = ? '
+                                               'AND regkey = ? ORDER BY idx')]
+
+    @property
+    def Count(self):
+        "Number of packages"
+        return self.__query('SELECT COUNT(*) FROM packages WHERE product = ? AND regkey = ?', one=True)[0]
+
+    @property
+    def MainMenu(self):
+        "The IDE main menu as a string (see PRMainMenu.MenuToStr), or None if it has not been stored"
+        return self.__query('SELECT menu FROM snapshots WHERE product = ? AND regkey = ?', one=True)[0]
+
+    def GetPackageInfo(self, index):
+        """
+        Return the package info (dictionary, see PRPackage) given
+        a package index or name (case-insensitive), or None if not found.
+        """
+        if isinstance(index, basestring):
+            row = self.__query('SELECT info FROM packages WHERE product = ? AND regkey = ? AND name = ? '
+                               'ORDER BY idx', (index,), one=True)
+        else:
+            row = self.__query('SELECT info FROM packages WHERE product = ? AND regkey = ? AND idx = ?',
+                               (index,), one=True)
+        return None if row is None else json.loads(row[0])
+
+    def GetPackageInfos(self):
+        "List of all the package infos (in the IDE order)"
+        return [json.loads(row[0]) for row in self.__query('SELECT info FROM packages WHERE product = ? '
+                                                           'AND regkey = ? ORDER BY idx')]
+
+    def IsInstalled(self, pkname):
+        "Check if a package is installed (by its name, case-insensitive)"
+        return self.GetPackageInfo(pkname) is not None
+
+    def GetComponents(self, index):
+        """
+        Return the component names of a package given its index or name.
+        Raises EInventoryError if the components have not been stored.
+        """
+        self.__check_components()
+        if isinstance(index, basestring):
+            info = self.__query('SELECT idx FROM packages WHERE product = ? AND regkey = ? AND name = ? '
+                                'ORDER BY idx', (index,), one=True)
+            if info is None: return []
+            index = info[0]
+        return [row[0] for row in self.__query('SELECT name FROM components WHERE product = ? AND regkey = ? '
+                                               'AND package = ? ORDER BY idx', (index,))]
+
+    def FindComponent(self, compname):
+        """
+        Return the names of the packages registering a component (by its name,
+        case-insensitive). Raises EInventoryError if the components have not been stored.
+        """
+        self.__check_components()
+        return [row[0] for row in self.__query(
+            'SELECT p.name FROM components c JOIN packages p ON p.product = c.product AND '
+            'p.regkey = c.regkey AND p.idx = c.package WHERE c.product = ? AND c.regkey = ? '
+            'AND c.name = ? ORDER BY p.idx', (compname,))]
+
+    def __str__(self):
+        return pyrad.tostr('{0} ({1}): {2} packages, taken {3}'.format(self.Key[0], self.Key[1], self.Count,
+                           time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.Time))))
+
+    #------------------ PRIVATE METHODS ----------------------#
+
+    def __query(self, sql, args=(), one=False):
+        with self._lock:
+            cursor = self._db.execute(sql, self.Key + tuple(args))
+            return cursor.fetchone() if one else cursor.fetchall()
+
+    def __check_components(self):
+        if not self.HasComponents:
+            raise EInventoryError('The component names have not been stored in the snapshot '
+                                  '(see PRInventory.save)!')
+
+#-------------------------------------------------------------------------------
+
+def _connect(DBFile):
+    "Open the database file, creating the tables if needed"
+    db = sqlite3.connect(DBFile, check_same_thread=False)
+    db.executescript(INVENTORY_SCHEMA)
+    return db
+
+def _pknames(Req):
+    "Current package names (bypassing the result cache, see PReq)"
+    Req.cache_clear(['packages'])
+    return _check('IDE_Packages_getPackagesValue',
+                  Req.get_result('IDE_Packages_getPackagesValue', 'PackageNames'), list)
+
+#-------------------------------------------------------------------------------
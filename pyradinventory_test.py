@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyradinventory_test
+# Purpose:     tests of the persistent IDE snapshots (PRInventory) against
+#              the fake DataSnap server (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyradinventory, pytest
+from pyradinventory import PRInventory
+
+#-------------------------------------------------------------------------------
+
+@pytest.fixture
+def dbfile(tmp_path):
+    return str(tmp_path / 'inventory.db')
+
+def test_save_and_open(server, connect, dbfile):
+    Req = connect(server)
+    environment = Req.get_result('IDE_Common_getEnvironment')
+    key = (environment['ProductIdentifier'], environment['BaseRegistryKey'])
+    PRInventory.save(Req, dbfile, Components=True).close()
+    assert PRInventory.keys(dbfile) == [key]
+    with PRInventory.open(dbfile, *key) as inventory:
+        assert inventory.Count == 10
+        assert inventory.PackageNames[3] == 'dclpackage3_250.bpl'
+        assert inventory.GetPackageInfo('DCLPACKAGE3_250.BPL') == inventory.GetPackageInfo(3)
+        assert inventory.GetPackageInfo(3)['Loaded'] is True
+        assert inventory.IsInstalled('dclpackage9_250.bpl') and not inventory.IsInstalled('missing.bpl')
+        assert inventory.GetComponents('dclpackage2_250.bpl')[-1] == 'TDclpackage2Component4'
+        assert inventory.FindComponent('tdclpackage2component4') == ['dclpackage2_250.bpl']
+        assert inventory.MainMenu.startswith('Menu0')
+        assert inventory.Environment == environment
+
+def test_open_missing(dbfile):
+    with pytest.raises(pyradinventory.EInventoryError):
+        PRInventory.open(dbfile, 'Delphi', 'Software\\Embarcadero\\BDS\\23.0')
+
+def test_components_not_stored(server, connect, dbfile):
+    with PRInventory.save(connect(server), dbfile, MainMenu=False) as inventory:
+        assert inventory.MainMenu is None
+        with pytest.raises(pyradinventory.EInventoryError):
+            inventory.FindComponent('TDclpackage2Component4')
+
+def test_load_validates(server, connect, dbfile):
+    Req = connect(server)
+    PRInventory.load(Req, dbfile).close()
+    ninfos = server.Calls['IDE_Packages_getPackageInfo']
+    # a valid snapshot is reused (the environment and the package names are checked)
+    with PRInventory.load(Req, dbfile) as inventory:
+        assert server.Calls['IDE_Packages_getPackageInfo'] == ninfos
+        assert not inventory.IsStale(Req)
+        Req.get_result('IDE_Packages_Install', 'c:\\x\\new1.bpl')
+        assert inventory.IsStale(Req)
+    # a stale one is taken again
+    with PRInventory.load(Req, dbfile) as inventory:
+        assert inventory.Count == 11
+    assert server.Calls['IDE_Packages_getPackageInfo'] == ninfos + 11
+
+def test_load_max_age(server, connect, dbfile):
+    Req = connect(server)
+    PRInventory.load(Req, dbfile).close()
+    Req.get_result('IDE_Packages_Install', 'c:\\x\\new1.bpl')
+    with PRInventory.load(Req, dbfile, MaxAge=60) as inventory:
+        assert inventory.Count == 10
+    # the components are retrieved if they have not been stored
+    with PRInventory.load(Req, dbfile, MaxAge=60, Components=True) as inventory:
+        assert inventory.HasComponents and inventory.Count == 11
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyradstubs
+# Purpose:     client stubs generated from the DataSnap server method metadata
+#              (DSAdmin.GetServerMethods / GetServerMethodParameters)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+from __future__ import print_function
+import pyrad, os, json, time
+from pyrad import basestring, tostr
+
+#-------------------------------------------------------------------------------
+
+class EStubError(pyrad.EGenericError):
+    "Exception class for this module (pyradstubs)"
+    pass
+
+# DBX parameter directions (DSAdmin.GetServerMethodParameters)
+PARAM_IN, PARAM_OUT, PARAM_INOUT, PARAM_RETURN = 1, 2, 3, 4
+
+def _encode_int(value):
+    try:
+        if not isinstance(value, bool) and (int(value) == value): return tostr(int(value))
+    except (TypeError, ValueError):
+        pass
+    raise EStubError('Integer argument expected, got {0!r}!'.format(value))
+
+def _encode_bool(value):
+    if not isinstance(value, bool):
+        raise EStubError('Boolean argument expected, got {0!r}!'.format(value))
+    return tostr(value)
+
+def _encode_str(value):
+    return value if isinstance(value, basestring) else tostr(value)
+
+# Argument encoders by DBX type name (other types are encoded as strings)
+ENCODERS = {
+    'Integer': _encode_int, 'Int32': _encode_int, 'Int64': _encode_int,
+    'SmallInt': _encode_int, 'Cardinal': _encode_int, 'Word': _encode_int,
+    'Boolean': _encode_bool,
+    }
+
+#-------------------------------------------------------------------------------
+
+def _rows(table):
+    """
+    Convert a DBX reader returned by DSAdmin ({"table": [column descriptions],
+    "<column>": [values], ...}) into a list of dictionaries (one per row).
+    A list of dictionaries is returned as is.
+    """
+    if isinstance(table, list): return table
+    if not (isinstance(table, dict) and ('table' in table)):
+        raise EStubError('Wrong server method metadata: {0!r}'.format(table)[:500])
+    columns = [column[0] for column in table['table']]
+    return [dict(zip(columns, values)) for values in zip(*[table[column] for column in columns])]
+
+def fetch_methods(Req):
+    """
+    Retrieve the descriptions of the server methods of the client's server class
+    (the last segment of the DataSnap URL, e.g. 'TServerClass') by calling
+    DSAdmin.GetServerMethods and DSAdmin.GetServerMethodParameters.
+    Returns a list of dictionaries:
+        * Name:         method name (e.g. 'IDE_Packages_getCompName')
+        * Params:       list of [parameter name, type name] (input parameters)
+        * ReturnType:   result type name (or None)
+    """
+    ServerClass = Req.URL.strip('/').rsplit('/', 1)[-1]
+    adminurl = Req.Dserver.rstrip('/').rsplit('/', 1)[0] + '/DSAdmin/'
+    tables = []
+    for func_name in ('GetServerMethods', 'GetServerMethodParameters'):
+        Res = Req.get_result(func_name, url=adminurl + func_name, requesttype='get')
+        if isinstance(Res, basestring) and Res.startswith('ERROR: '):
+            raise EStubError('{0} has failed: {1}'.format(func_name, Res))
+        tables.append(_rows(Res))
+    methods = pyrad.OrderedDict()
+    for row in tables[0]:
+        sclass, _, name = row['MethodAlias'].rpartition('.')
+        if (sclass or row.get('ServerClassName')) == ServerClass:
+            methods[name] = {'Name': name, 'Params': [], 'ReturnType': None}
+    for row in tables[1]:
+        method = methods.get(row['MethodAlias'].rpartition('.')[2])
+        if method is None: continue
+        direction = int(row.get('ParameterDirection', PARAM_IN))
+        if direction == PARAM_RETURN:
+            method['ReturnType'] = row.get('TypeName')
+        elif direction in (PARAM_IN, PARAM_INOUT):
+            method['Params'].append([row['ParameterName'], row.get('TypeName')])
+    return list(methods.values())
+
+#-------------------------------------------------------------------------------
+
+class PRStub(object):
+    """
+    Callable stub of a single server method: Stub(*args, **kwargs) is the same
+    as Req.get_result(Name, *args, **kwargs), but the request URL prefix is
+    prebuilt, the number of arguments is checked and the arguments are encoded
+    by their declared types (see ENCODERS). The arguments may also be passed
+    by their parameter names. Other keyword arguments (e.g. 'deadline')
+    are passed to get_result.
+    ------------------------------------------------------------
+    Available properties:
+        * Name:         (string) method name
+        * Params:       (list) [parameter name, type name] pairs
+        * ReturnType:   (string) result type name
+        * Read:         (bool) whether the method only reads the IDE state
+                        (see pyrad.READ_METHODS), i.e. its results may be cached
+                        and its failed calls retried
+    """
+    __slots__ = ('Name', 'Params', 'ReturnType', 'Read', '_Req', '_url', '_encoders', '_names')
+
+    def __init__(self, Req, Name, Params=(), ReturnType=None):
+        self._Req = Req
+        self.Name = Name
+        self.Params = [tuple(param) for param in Params]
+        self.ReturnType = ReturnType
+        self.Read = Name in pyrad.READ_METHODS
+        self._url = Req._make_url(Name)
+        self._encoders = [ENCODERS.get(ptype, _encode_str) for _, ptype in self.Params]
+        self._names = [pname for pname, _ in self.Params]
+
+    def __call__(self, *args, **kwargs):
+        if kwargs and self._names:
+            args = list(args)
+            for pname in self._names[len(args):]:
+                if pname not in kwargs: break
+                args.append(kwargs.pop(pname))
+        if len(args) != len(self._encoders):
+            raise EStubError('{0} takes {1} argument(s) ({2} given)!'.format(
+                             self.Name, len(self._encoders), len(args)))
+        sargs = [encode(arg) for encode, arg in zip(self._encoders, args)]
+        return self._Req.get_result(self.Name, *sargs, url=self._url + '/'.join(sargs), **kwargs)
+
+    @property
+    def Signature(self):
+        "Method signature as a string, e.g. 'IDE_Packages_getCompName(index: Integer, compindex: Integer) -> string'"
+        return '{0}({1}) -> {2}'.format(self.Name,
+            ', '.join('{0}: {1}'.format(pname, ptype) for pname, ptype in self.Params), self.ReturnType)
+
+    def __repr__(self):
+        return '<PRStub {0}>'.format(self.Signature)
+
+class PRStubs(object):
+    """
+    Collection of stubs (PRStub) of all the server methods, available
+    as attributes under the method names:
+        Stubs = PRStubs.load(Req, CacheFile='pyrad_stubs.json')
+        count = Stubs.IDE_Packages_getCompCount(0)
+    A method named like an attribute of the collection itself (e.g. 'save'
+    or 'Names') is only available by indexing: Stubs['save'].
+    The method descriptions are retrieved from the server (see fetch_methods)
+    or loaded from the cache file, where they are kept per server URL
+    (see 'load').
+    """
+    def __init__(self, Req, methods):
+        """
+        <Constructor>
+        Create the stubs for the client Req from the method descriptions
+        (see fetch_methods).
+        """
+        self._Req = Req
+        self._methods = list(methods)
+        self._stubs = pyrad.OrderedDict((method['Name'], PRStub(Req, method['Name'], method['Params'],
+                                         method['ReturnType'])) for method in self._methods)
+
+    def __getattr__(self, name):
+        """
+        <Attribute access>
+        Return the stub of the server method 'name' (called only if the object
+        has no attribute of this name).
+        """
+        stub = self.__dict__.get('_stubs', {}).get(name)
+        if stub is None:
+            raise AttributeError("'{0}' object has no attribute '{1}'".format(type(self).__name__, name))
+        return stub
+
+    @classmethod
+    def load(cls, Req, CacheFile=None, MaxAge=None):
+        """
+        Create the stubs for the client Req, taking the method descriptions
+        from the cache file (if given) if they have been saved for the same
+        server less than MaxAge seconds ago (or any time if MaxAge is None).
+        Otherwise the descriptions are retrieved from the server and saved
+        to the cache file.
+        """
+        if CacheFile:
+            try:
+                with open(CacheFile) as ifile:
+                    entry = json.load(ifile).get(Req.Dserver)
+                if entry and ((MaxAge is None) or (time.time() - entry['time'] < MaxAge)):
+                    return cls(Req, entry['methods'])
+            except (IOError, OSError, ValueError, AttributeError, KeyError):
+                pass
+        stubs = cls(Req, fetch_methods(Req))
+        if CacheFile: stubs.save(CacheFile)
+        return stubs
+
+    def save(self, CacheFile):
+        """
+        Save the method descriptions to the cache file (keeping the entries of other servers).
+        """
+        try:
+            with open(CacheFile) as ifile:
+                servers = json.load(ifile)
+            if not isinstance(servers, dict): servers = {}
+        except (IOError, OSError, ValueError):
+            servers = {}
+        servers[self._Req.Dserver] = {'time': time.time(), 'methods': self._methods}
+        tmpname = '{0}.{1}.tmp'.format(CacheFile, os.getpid())
+        with open(tmpname, 'w') as ofile:
+            json.dump(servers, ofile, indent=1)
+        getattr(os, 'replace', os.rename)(tmpname, CacheFile)
+
+    @property
+    def Names(self):
+        "List of the method names"
+        return [method['Name'] for method in self._methods]
+
+    def __iter__(self):
+        """
+        <Iteration protocol>
+        Yield the stubs.
+        """
+        for stub in self._stubs.values():
+            yield stub
+
+    def __len__(self):
+        return len(self._stubs)
+
+    def __contains__(self, name):
+        return name in self._stubs
+
+    def __getitem__(self, name):
+        return self._stubs[name]
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:        pyradstubs_test
+# Purpose:     tests of the server method stubs (pyradstubs) against
+#              the fake DataSnap server (run with pytest)
+#
+# Author:      ShafikovIS
+#
+# Created:     18.10.2026
+# Copyright:   (c) ShafikovIS 2026
+# Licence:     <your licence>
+#-------------------------------------------------------------------------------
+
+import pyradstubs, pytest
+
+#-------------------------------------------------------------------------------
+
+def test_stubs(server, connect):
+    Stubs = pyradstubs.PRStubs.load(connect(server))
+    assert 'IDE_Packages_getCompCount' in Stubs
+    assert len(Stubs) == len(Stubs.Names) == len(list(Stubs))
+    assert Stubs.IDE_Packages_getCount() == 10
+    assert Stubs.IDE_Packages_getCompCount(2) == 5
+    assert Stubs['IDE_Packages_getPackageInfoValue'](3, 'Name') == 'dclpackage3_250.bpl'
+    assert Stubs.IDE_Packages_getCompCount.Read
+    with pytest.raises(AttributeError):
+        Stubs.IDE_Missing
+
+def test_stub_arguments(server, connect):
+    Stubs = pyradstubs.PRStubs.load(connect(server))
+    stub = Stubs.IDE_Packages_getCompCount
+    with pytest.raises(pyradstubs.EStubError):
+        stub()
+    with pytest.raises(pyradstubs.EStubError):
+        stub('two')
+    assert stub(**{stub.Params[0][0]: 1}) == 5
+
+def test_stubs_cache_file(server, connect, tmp_path, monkeypatch):
+    fetched = []
+    fetch_methods = pyradstubs.fetch_methods
+    monkeypatch.setattr(pyradstubs, 'fetch_methods', lambda Req: fetched.append(1) or fetch_methods(Req))
+    cachefile = str(tmp_path / 'stubs.json')
+    Req = connect(server)
+    names = pyradstubs.PRStubs.load(Req, CacheFile=cachefile).Names
+    Stubs = pyradstubs.PRStubs.load(Req, CacheFile=cachefile)
+    assert Stubs.Names == names
+    assert len(fetched) == 1
+    pyradstubs.PRStubs.load(Req, CacheFile=cachefile, MaxAge=0)
+    assert len(fetched) == 2
+
+def test_stub_name_clashes(server, connect):
+    methods = [{'Name': name, 'Params': [], 'ReturnType': 'string'}
+               for name in ('save', 'Names', 'IDE_Packages_getCount')]
+    Stubs = pyradstubs.PRStubs(connect(server), methods)
+    # the collection attributes are not overwritten by the stubs
+    assert Stubs.Names == ['save', 'Names', 'IDE_Packages_getCount']
+    assert callable(Stubs.save) and not isinstance(Stubs.save, pyradstubs.PRStub)
+    assert Stubs['save'].Name == 'save'
+    assert [stub.Name for stub in Stubs] == Stubs.Names
+    assert Stubs.IDE_Packages_getCount() == 10